@@ -0,0 +1,178 @@
+"""Сравнение представлений чтения под WSGI и ASGI на одной нагрузке.
+
+Запуск: python -m benchmarks.asgi_vs_wsgi [--requests N] [--concurrency C]
+
+Каждая конфигурация запускается в отдельном процессе на одной и той же
+заранее наполненной базе:
+- wsgi: синхронные представления, потоки сервера;
+- asgi-sync: синхронные представления под ASGI (общий поток sync_to_async);
+- asgi-async: асинхронные представления с отдельным пулом потоков.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.environment import (
+    BASE_DIR, seed, session_cookie, setup_django, summary,
+)
+
+CONFIGURATIONS = (
+    ('wsgi', '0'),
+    ('asgi-sync', '0'),
+    ('asgi-async', '1'),
+)
+DUMMY_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    'state': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+def workload(users, notes_per_user, requests):
+    """Пути запросов вперемешку: список, заметка и API списка."""
+    paths = []
+    for index in range(requests):
+        author = f'bench-{index % users}'
+        note = index % notes_per_user
+        paths.append((author, (
+            '/notes/',
+            f'/note/{author}-{note}/',
+            '/api/notes/',
+        )[index % 3]))
+    return paths
+
+
+def run_wsgi(paths, cookies, concurrency):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+
+    def request(item):
+        author, path = item
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'HTTP_HOST': 'localhost',
+            'HTTP_COOKIE': cookies[author],
+            'wsgi.input': io.BytesIO(),
+            'wsgi.url_scheme': 'http',
+        }
+        started = time.perf_counter()
+        response = handler(environ, lambda status, headers: None)
+        b''.join(response)
+        response.close()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(request, paths))
+    return summary(latencies, time.perf_counter() - started)
+
+
+def run_asgi(paths, cookies, concurrency):
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+
+    async def request(item, semaphore):
+        author, path = item
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'headers': [
+                (b'host', b'localhost'),
+                (b'cookie', cookies[author].encode()),
+            ],
+            'server': ('localhost', 80),
+            'client': ('127.0.0.1', 50000),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            pass
+
+        async with semaphore:
+            started = time.perf_counter()
+            await application(scope, receive, send)
+            return time.perf_counter() - started
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(
+            *(request(item, semaphore) for item in paths)
+        )
+
+    started = time.perf_counter()
+    latencies = asyncio.run(main())
+    return summary(latencies, time.perf_counter() - started)
+
+
+def child(args):
+    setup_django(args.db, CACHES=DUMMY_CACHES)
+    from django.contrib.auth import get_user_model
+
+    authors = get_user_model().objects.filter(username__startswith='bench-')
+    cookies = {author.username: session_cookie(author) for author in authors}
+    paths = workload(args.users, args.notes, args.requests)
+    if args.child == 'wsgi':
+        result = run_wsgi(paths, cookies, args.concurrency)
+    else:
+        result = run_asgi(paths, cookies, args.concurrency)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--notes', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = Path(directory) / 'bench.sqlite3'
+        setup_django(db_path)
+        seed(args.users, args.notes)
+        print(f'{"mode":<12}{"rps":>10}{"p50, мс":>10}{"p99, мс":>10}')
+        for mode, async_views in CONFIGURATIONS:
+            env = dict(os.environ, NOTES_ASYNC_VIEWS=async_views)
+            output = subprocess.run(
+                [
+                    sys.executable, '-m', 'benchmarks.asgi_vs_wsgi',
+                    '--child', mode.split('-')[0], '--db', str(db_path),
+                    '--users', str(args.users), '--notes', str(args.notes),
+                    '--requests', str(args.requests),
+                    '--concurrency', str(args.concurrency),
+                ],
+                cwd=BASE_DIR, env=env, check=True, capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f'{mode:<12}{result["rps"]:>10}{result["p50_ms"]:>10}'
+                  f'{result["p99_ms"]:>10}')
+
+
+if __name__ == '__main__':
+    main()
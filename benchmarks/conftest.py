@@ -0,0 +1,158 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from django.conf import global_settings
+from django.contrib.auth import get_user_model
+from django.test.utils import override_settings
+
+from benchmarks.environment import seed, summary
+from notes.stats import recompute_stats
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+RESULTS_PATH = Path(__file__).parent / 'results' / 'latest.json'
+PASSWORD = 'bench-password-1'
+# Байты ответа и пик памяти от машины не зависят: запас только на
+# случайные CSRF-токены и мелкие колебания аллокатора.
+SIZE_TOLERANCE = 1.1
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--bench-users', type=int, default=5,
+                    help='Сколько пользователей создать.')
+    group.addoption('--bench-notes', type=int, default=200,
+                    help='Сколько заметок у каждого пользователя.')
+    group.addoption('--bench-rounds', type=int, default=30,
+                    help='Сколько раз повторить каждый сценарий.')
+    group.addoption('--bench-timing', action='store_true',
+                    help='Сверять и время ответа: p50 с базовым.')
+    group.addoption('--bench-tolerance', type=float, default=1.5,
+                    help='Во сколько раз p50 может превысить базовый '
+                         '(с --bench-timing).')
+    group.addoption('--bench-baseline', default=str(BASELINE_PATH),
+                    help='JSON с базовыми результатами.')
+    group.addoption('--bench-update-baseline', action='store_true',
+                    help='Записать результаты как новые базовые.')
+
+
+class Recorder:
+    """Собирает результаты сценариев и сверяет их с базовыми.
+
+    Число запросов, байты ответа и пик памяти сверяются всегда. Время
+    зависит от машины и её загрузки, поэтому p50 сверяется только с
+    --bench-timing, с базовыми результатами той же машины.
+    """
+
+    def __init__(self, baseline, tolerance, timing=False):
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.timing = timing
+        self.results = {}
+
+    def record(self, name, latencies, queries, elapsed, **extra):
+        result = dict(summary(latencies, elapsed), queries=queries, **extra)
+        self.results[name] = result
+        return self.regressions(name, result)
+
+    def regressions(self, name, result):
+        base = self.baseline.get(name)
+        if base is None:
+            return []
+        problems = []
+        if result['queries'] > base['queries']:
+            problems.append(
+                f'{name}: запросов {result["queries"]}, '
+                f'было {base["queries"]}'
+            )
+        if self.timing and result['p50_ms'] > base['p50_ms'] * self.tolerance:
+            problems.append(
+                f'{name}: p50 {result["p50_ms"]} мс, '
+                f'было {base["p50_ms"]} мс'
+            )
+        wire = base.get('wire_bytes', 0) * SIZE_TOLERANCE
+        if result.get('wire_bytes', 0) > wire:
+            problems.append(
+                f'{name}: {result["wire_bytes"]} байт в ответе, '
+                f'было {base["wire_bytes"]}'
+            )
+        peak = base.get('peak_kib', 0) * SIZE_TOLERANCE
+        if result.get('peak_kib', 0) > peak:
+            problems.append(
+                f'{name}: пик памяти {result["peak_kib"]} КиБ, '
+                f'было {base["peak_kib"]} КиБ'
+            )
+        return problems
+
+
+@pytest.fixture(scope='session')
+def recorder(request):
+    options = request.config.option
+    baseline_path = Path(options.bench_baseline)
+    baseline = {}
+    if baseline_path.exists() and not options.bench_update_baseline:
+        baseline = json.loads(baseline_path.read_text())
+    recorder = Recorder(
+        baseline, options.bench_tolerance, timing=options.bench_timing
+    )
+    yield recorder
+    RESULTS_PATH.parent.mkdir(exist_ok=True)
+    output = json.dumps(recorder.results, indent=2, sort_keys=True)
+    RESULTS_PATH.write_text(output + '\n')
+    if options.bench_update_baseline:
+        baseline_path.write_text(output + '\n')
+
+
+@pytest.fixture(scope='session')
+def production_hashers():
+    # Тестовые настройки хешируют пароли MD5, а меряем рабочий хешер.
+    hashers = global_settings.PASSWORD_HASHERS
+    with override_settings(PASSWORD_HASHERS=hashers):
+        yield
+
+
+@pytest.fixture(scope='session')
+def authors(request, production_hashers, django_db_setup, django_db_blocker):
+    """Пользователи с заметками: создаются один раз на весь прогон."""
+    options = request.config.option
+    with django_db_blocker.unblock():
+        authors = seed(options.bench_users, options.bench_notes)
+        recompute_stats([author.pk for author in authors])
+        get_user_model().objects.create_user('bench-login', password=PASSWORD)
+    return authors
+
+
+@pytest.fixture(autouse=True)
+def uncached_pages(settings):
+    # Меряем сами представления, а не попадания в кеш страниц.
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'state': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'state',
+        },
+        'pages': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    }
+    settings.NOTES_CACHE_ALIAS = 'pages'
+
+
+@pytest.fixture
+def rounds(request):
+    return request.config.option.bench_rounds
+
+
+def measure(action, rounds):
+    """Задержки каждого вызова action(index) и общее время."""
+    latencies = []
+    started = time.perf_counter()
+    for index in range(1, rounds + 1):
+        call_started = time.perf_counter()
+        action(index)
+        latencies.append(time.perf_counter() - call_started)
+    return latencies, time.perf_counter() - started
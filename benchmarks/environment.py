@@ -0,0 +1,87 @@
+"""Окружение для бенчмарков: отдельная база SQLite и тестовые данные."""
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path, **overrides):
+    """Настраивает Django на базу db_path и применяет миграции."""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+
+
+def seed(users, notes_per_user, text_size=200):
+    """Создаёт users пользователей по notes_per_user заметок у каждого."""
+    from io import StringIO
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from notes.models import Note
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'bench-{index}') for index in range(users)
+    )
+    authors = list(User.objects.filter(username__startswith='bench-'))
+    text = 'Текст заметки. ' * (text_size // 15 + 1)
+    sample = Note(text=text[:text_size])
+    sample.render_text()
+    for author in authors:
+        Note.objects.bulk_create(
+            (
+                Note(
+                    title=f'Заметка {index}',
+                    text=sample.text,
+                    text_html=sample.text_html,
+                    text_hash=sample.text_hash,
+                    slug=f'{author.username}-{index}',
+                    author=author,
+                )
+                for index in range(notes_per_user)
+            ),
+            batch_size=500,
+        )
+    # bulk_create индекс не обновляет, а удалить из индекса FTS5 с внешним
+    # содержимым заметку, которой в нём нет, нельзя.
+    call_command('rebuild_search_index', stdout=StringIO())
+    return authors
+
+
+def session_cookie(user):
+    """Cookie авторизованной сессии пользователя."""
+    from django.conf import settings
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+    name = settings.SESSION_COOKIE_NAME
+    return f'{name}={client.cookies[name].value}'
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summary(latencies, elapsed):
+    """Пропускная способность и задержки в миллисекундах."""
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
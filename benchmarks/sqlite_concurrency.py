@@ -0,0 +1,130 @@
+"""Пропускная способность читателей и писателей SQLite по профилям.
+
+Запуск: python -m benchmarks.sqlite_concurrency [--seconds S]
+        [--readers R] [--writers W]
+
+Каждый профиль SQLITE_PROFILES (default - настройки SQLite по умолчанию,
+production - WAL и PRAGMA из settings) проверяется в отдельном процессе
+на своей базе: R потоков читают списки заметок, W потоков их меняют.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.environment import BASE_DIR, seed, setup_django
+
+PROFILES = ('default', 'production')
+
+
+def reader(author_ids, deadline, stats):
+    from django.db import OperationalError, connection
+
+    from notes.models import Note
+
+    index = 0
+    while time.monotonic() < deadline:
+        author_id = author_ids[index % len(author_ids)]
+        index += 1
+        try:
+            list(Note.objects.filter(author_id=author_id)
+                 .only('id', 'slug', 'title').order_by('id')[:100])
+            stats['reads'] += 1
+        except OperationalError:
+            stats['errors'] += 1
+    connection.close()
+
+
+def writer(notes, deadline, stats):
+    from django.db import OperationalError, connection
+
+    index = 0
+    while time.monotonic() < deadline:
+        note = notes[index % len(notes)]
+        index += 1
+        note.text = f'Правка {index}'
+        try:
+            note.save()
+            stats['writes'] += 1
+        except OperationalError:
+            # "database is locked": писатель не дождался блокировки.
+            stats['errors'] += 1
+    connection.close()
+
+
+def child(args):
+    setup_django(args.db)
+    from notes.models import Note
+
+    authors = seed(args.users, args.notes)
+    author_ids = [author.id for author in authors]
+    stats = [{'reads': 0, 'writes': 0, 'errors': 0}
+             for _ in range(args.readers + args.writers)]
+    deadline = time.monotonic() + args.seconds
+    threads = [
+        threading.Thread(target=reader, args=(author_ids, deadline, stat))
+        for stat in stats[:args.readers]
+    ]
+    for number, stat in enumerate(stats[args.readers:]):
+        notes = list(Note.objects.filter(author_id=author_ids[
+            number % len(author_ids)
+        ])[:50])
+        threads.append(
+            threading.Thread(target=writer, args=(notes, deadline, stat))
+        )
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    totals = {
+        key: sum(stat[key] for stat in stats)
+        for key in ('reads', 'writes', 'errors')
+    }
+    print(json.dumps({
+        'reads_per_sec': round(totals['reads'] / args.seconds, 1),
+        'writes_per_sec': round(totals['writes'] / args.seconds, 1),
+        'errors': totals['errors'],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--notes', type=int, default=500)
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+
+    print(f'{"profile":<12}{"reads/s":>10}{"writes/s":>10}{"errors":>8}')
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in PROFILES:
+            output = subprocess.run(
+                [
+                    sys.executable, '-m', 'benchmarks.sqlite_concurrency',
+                    '--child', '--db', str(Path(directory) / profile),
+                    '--seconds', str(args.seconds),
+                    '--readers', str(args.readers),
+                    '--writers', str(args.writers),
+                    '--users', str(args.users), '--notes', str(args.notes),
+                ],
+                cwd=BASE_DIR, env=dict(os.environ, SQLITE_PROFILE=profile),
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f'{profile:<12}{result["reads_per_sec"]:>10}'
+                  f'{result["writes_per_sec"]:>10}{result["errors"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Бенчмарки CRUD заметок и авторизации через тестовый клиент.
+
+Запуск: ``pytest benchmarks``. Результаты пишутся в
+benchmarks/results/latest.json и сверяются с benchmarks/baseline.json:
+число запросов и байты ответа всегда, время - только с ``--bench-timing``.
+``--bench-update-baseline`` перезаписывает базовые результаты.
+"""
+import pytest
+
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from benchmarks.conftest import PASSWORD, measure
+from notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+# Верхняя граница числа запросов к базе на один запрос к представлению.
+QUERY_BUDGETS = {
+    'list': 5,
+    'detail': 1,
+    'create': 16,
+    'update': 18,
+    'delete': 15,
+    'signup': 2,
+    'login': 9,
+}
+
+
+@pytest.fixture
+def author(authors):
+    return authors[0]
+
+
+@pytest.fixture
+def author_client(author):
+    client = Client()
+    client.force_login(author)
+    return client
+
+
+def run(recorder, name, action, rounds):
+    """Прогоняет сценарий, проверяет бюджет запросов и регрессии."""
+    with CaptureQueriesContext(connection) as queries:
+        action(0)
+    # Журнал запросов сбрасывается на каждом следующем запросе клиента.
+    count = len(queries)
+    assert count <= QUERY_BUDGETS[name], (
+        f'{name}: {count} запросов вместо {QUERY_BUDGETS[name]}'
+    )
+    latencies, elapsed = measure(action, rounds)
+    problems = recorder.record(name, latencies, count, elapsed)
+    assert not problems, '; '.join(problems)
+
+
+def test_list(recorder, rounds, authors):
+    clients = []
+    for user in authors:
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+    url = reverse('notes:list')
+
+    def action(index):
+        response = clients[index % len(clients)].get(url)
+        assert response.status_code == 200
+
+    run(recorder, 'list', action, rounds)
+
+
+def test_detail(recorder, rounds, author, author_client):
+    slugs = list(
+        Note.objects.filter(author=author).values_list('slug', flat=True)
+    )
+
+    def action(index):
+        url = reverse('notes:detail', args=(slugs[index % len(slugs)],))
+        assert author_client.get(url).status_code == 200
+
+    run(recorder, 'detail', action, rounds)
+
+
+def test_create(recorder, rounds, author_client):
+    url = reverse('notes:add')
+
+    def action(index):
+        response = author_client.post(url, {
+            'title': f'Новая заметка {index}',
+            'text': 'Текст новой заметки',
+            'slug': f'bench-new-{index}',
+        })
+        assert response.status_code == 302
+
+    run(recorder, 'create', action, rounds)
+
+
+def test_update(recorder, rounds, author, author_client):
+    slugs = list(
+        Note.objects.filter(author=author).values_list('slug', flat=True)
+    )
+
+    def action(index):
+        slug = slugs[index % len(slugs)]
+        response = author_client.post(
+            reverse('notes:edit', args=(slug,)),
+            {'title': f'Правка {index}', 'text': 'Новый текст', 'slug': slug},
+        )
+        assert response.status_code == 302
+
+    run(recorder, 'update', action, rounds)
+
+
+def test_delete(recorder, rounds, author, author_client):
+    slugs = list(
+        Note.objects.filter(author=author).values_list('slug', flat=True)
+    )
+    assert len(slugs) > rounds, 'Увеличьте --bench-notes'
+
+    def action(index):
+        response = author_client.post(
+            reverse('notes:delete', args=(slugs[index],))
+        )
+        assert response.status_code == 302
+
+    run(recorder, 'delete', action, rounds)
+
+
+def test_signup(recorder, rounds, authors):
+    url = reverse('users:signup')
+
+    def action(index):
+        response = Client().post(url, {
+            'username': f'bench-signup-{index}',
+            'password1': PASSWORD,
+            'password2': PASSWORD,
+        })
+        assert response.status_code == 302
+
+    run(recorder, 'signup', action, rounds)
+
+
+def test_login(recorder, rounds, authors):
+    url = reverse('users:login')
+
+    def action(index):
+        response = Client().post(url, {
+            'username': 'bench-login',
+            'password': PASSWORD,
+        })
+        assert response.status_code == 302
+
+    run(recorder, 'login', action, rounds)
@@ -0,0 +1,85 @@
+"""Большие заметки: выборка только нужных полей против полных строк.
+
+Каждый сценарий выбирает страницу заметок автора двумя способами и
+сравнивает задержку и пик памяти Python (tracemalloc).
+"""
+import time
+import tracemalloc
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+NOTES = 20
+TEXT_SIZE = 256 * 1024
+
+SCENARIOS = {
+    'list': lambda notes: notes.for_list(),
+    'detail': lambda notes: notes.for_detail(),
+    'delete': lambda notes: notes.for_delete(),
+}
+
+
+@pytest.fixture
+def large_notes(django_user_model):
+    author = django_user_model.objects.create(username='bench-large')
+    text = ('Длинный абзац заметки. ' * (TEXT_SIZE // 23 + 1))[:TEXT_SIZE]
+    sample = Note(text=text)
+    sample.render_text()
+    Note.objects.bulk_create(
+        Note(
+            title=f'Большая заметка {index}',
+            text=sample.text,
+            text_html=sample.text_html,
+            text_hash=sample.text_hash,
+            slug=f'bench-large-{index}',
+            author=author,
+        )
+        for index in range(NOTES)
+    )
+    return Note.objects.filter(author=author)
+
+
+def profile(queryset, rounds):
+    """Задержки выборки, общее время и пик памяти в КиБ."""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        call_started = time.perf_counter()
+        list(queryset.all())
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    list(queryset.all())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return latencies, elapsed, round(peak / 1024, 1)
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_projection_beats_full_rows(recorder, rounds, large_notes, scenario):
+    projected = SCENARIOS[scenario](large_notes)
+    with CaptureQueriesContext(connection) as queries:
+        list(projected)
+    count = len(queries)
+    full = profile(large_notes, rounds)
+    latencies, elapsed, peak = profile(projected, rounds)
+    problems = recorder.record(
+        f'large_{scenario}', latencies, count, elapsed, peak_kib=peak
+    )
+    assert not problems, '; '.join(problems)
+    recorder.record(
+        f'large_{scenario}_full_rows', full[0], count, full[1],
+        peak_kib=full[2],
+    )
+    assert peak * 10 < full[2]
+    if scenario != 'detail':
+        # Детальной странице база всё равно читает HTML ради его длины.
+        assert recorder.results[f'large_{scenario}']['p50_ms'] * 5 < (
+            recorder.results[f'large_{scenario}_full_rows']['p50_ms']
+        )
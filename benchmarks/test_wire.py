@@ -0,0 +1,81 @@
+"""Байты в ответе и задержка страниц заметок со сжатием и без.
+
+Для каждой страницы сравниваются ответ без сжатия, gzip, brotli (если
+установлен пакет brotli) и повторный запрос с If-None-Match, на который
+приходит 304 без тела.
+"""
+import pytest
+
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from benchmarks.conftest import measure
+from notes.models import Note
+from notes.storage import brotli
+
+pytestmark = pytest.mark.django_db
+
+ENCODINGS = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+
+@pytest.fixture
+def cached_pages(settings):
+    # ETag строится по версии кеша страниц: нужен настоящий кеш.
+    settings.NOTES_CACHE_ALIAS = 'default'
+
+
+@pytest.fixture
+def pages(authors):
+    author = authors[0]
+    slug = Note.objects.filter(author=author).values_list(
+        'slug', flat=True
+    ).first()
+    return author, {
+        'list': reverse('notes:list'),
+        'detail': reverse('notes:detail', args=(slug,)),
+    }
+
+
+def record(recorder, name, client, url, rounds, **headers):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, **headers)
+    # Журнал запросов сбрасывается на каждом следующем запросе клиента.
+    count = len(queries)
+    size = len(
+        b''.join(response.streaming_content) if response.streaming
+        else response.content
+    )
+    latencies, elapsed = measure(lambda index: client.get(url, **headers),
+                                 rounds)
+    problems = recorder.record(
+        name, latencies, count, elapsed, wire_bytes=size
+    )
+    assert not problems, '; '.join(problems)
+    return response
+
+
+@pytest.mark.parametrize('page', ('list', 'detail'))
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_wire(recorder, rounds, pages, page, encoding):
+    author, urls = pages
+    client = Client()
+    client.force_login(author)
+    record(recorder, f'wire_{page}_{encoding}', client, urls[page], rounds,
+           HTTP_ACCEPT_ENCODING=encoding)
+
+
+@pytest.mark.parametrize('page', ('list', 'detail'))
+def test_wire_not_modified(recorder, rounds, pages, page, cached_pages):
+    author, urls = pages
+    client = Client()
+    client.force_login(author)
+    # Первый ответ выдаёт CSRF-cookie, ETag страницы с ней уже другой.
+    client.get(urls[page])
+    etag = client.get(urls[page], HTTP_ACCEPT_ENCODING='gzip')['ETag']
+    response = record(
+        recorder, f'wire_{page}_304', client, urls[page], rounds,
+        HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag,
+    )
+    assert response.status_code == 304
@@ -1,5 +1,69 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Q
 
-from .models import Note
+from .models import Folder, Note, Tag
+from .pagination import EstimatedCountPaginator
+from .search import get_backend
 
-admin.site.register(Note)
+# Поля строк списка: текст и HTML заметки в список не загружаются.
+CHANGELIST_FIELDS = (
+    'id', 'title', 'slug', 'updated',
+    'author__id', 'author__username', 'folder__id', 'folder__name',
+)
+
+
+class NoteChangeList(ChangeList):
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).only(*CHANGELIST_FIELDS)
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    """Админка заметок, не зависящая от размера таблицы.
+
+    Список сортируется по первичному ключу и считается по оценке СУБД,
+    автор выбирается по id, а поиск идёт через поисковый индекс.
+    """
+    list_display = ('id', 'title', 'author', 'folder', 'updated')
+    list_select_related = ('author', 'folder')
+    ordering = ('-id',)
+    sortable_by = ('id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_fields = ('=slug',)
+    fields = ('title', 'slug', 'author', 'folder', 'tags', 'text')
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('folder', 'tags')
+
+    def get_changelist(self, request, **kwargs):
+        return NoteChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        note_ids = get_backend().search(
+            None, search_term, settings.NOTES_ADMIN_SEARCH_LIMIT
+        )
+        return queryset.filter(
+            Q(pk__in=note_ids) | Q(slug=search_term.strip())
+        ), False
+
+
+@admin.register(Folder)
+class FolderAdmin(admin.ModelAdmin):
+    list_display = ('name', 'author', 'note_count')
+    list_select_related = ('author',)
+    search_fields = ('name',)
+    raw_id_fields = ('author',)
+    readonly_fields = ('note_count',)
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'author')
+    list_select_related = ('author',)
+    search_fields = ('name',)
+    raw_id_fields = ('author',)
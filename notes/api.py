@@ -0,0 +1,231 @@
+import hashlib
+import json
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .forms import NoteForm
+from .models import Note
+from .pagination import get_cursor, keyset_page
+from .stats import get_stats
+from .sync import changes_since
+
+LIST_FIELDS = ('id', 'slug', 'title', 'created', 'updated')
+DETAIL_FIELDS = LIST_FIELDS + ('text',)
+RELATION_FIELDS = ('folder', 'tags')
+
+
+def serialize_note(note, fields=DETAIL_FIELDS):
+    data = {field: getattr(note, field) for field in fields}
+    data['created'] = note.created.isoformat()
+    data['updated'] = note.updated.isoformat()
+    return data
+
+
+def make_etag(*parts):
+    return hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+
+def list_state(request):
+    """Последний номер изменения и время изменения заметок автора.
+
+    Номер из ChangeCounter сдвигает каждое сохранение заметки и каждое
+    удаление (номер надгробия берётся из того же счётчика). Обе строки
+    читаются одним запросом по первичным ключам, без обхода заметок, и
+    запоминаются на запросе: их используют и ETag, и Last-Modified.
+    """
+    if not hasattr(request, '_notes_list_state'):
+        request._notes_list_state = get_user_model().objects.filter(
+            pk=request.user.pk
+        ).values(
+            seq=F('changecounter__value'),
+            updated=F('note_stats__last_modified'),
+        ).get()
+    return request._notes_list_state
+
+
+def list_etag(request):
+    return make_etag(request.user.pk, list_state(request)['seq'] or 0)
+
+
+def list_last_modified(request):
+    return list_state(request)['updated']
+
+
+def detail_state(request, slug):
+    if not hasattr(request, '_note_state'):
+        request._note_state = Note.objects.filter(
+            author=request.user, slug=slug
+        ).values('id', 'updated').first()
+    return request._note_state
+
+
+def detail_etag(request, slug):
+    state = detail_state(request, slug)
+    if state is not None:
+        return make_etag(state['id'], state['updated'])
+
+
+def detail_last_modified(request, slug):
+    state = detail_state(request, slug)
+    if state is not None:
+        return state['updated']
+
+
+def parse_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def merge_current(data, instance, fields):
+    """Дополняет данные запроса текущими значениями полей заметки."""
+    if data is None:
+        return None
+    return {**model_to_dict(instance, fields=fields), **data}
+
+
+def error(message, status):
+    return JsonResponse({'detail': message}, status=status)
+
+
+class ApiNoteBase(generic.View):
+    """Базовый класс JSON API: только свои заметки, 401 без входа."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error('Требуется авторизация.', HTTPStatus.UNAUTHORIZED)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return Note.objects.filter(author=self.request.user).for_edit()
+
+    def save_form(self, data, instance=None, status=HTTPStatus.OK):
+        """Проверяет данные той же формой, что и HTML-страницы."""
+        if data is None:
+            return error('Ожидается JSON-объект.', HTTPStatus.BAD_REQUEST)
+        form = NoteForm(data, instance=instance, author=self.request.user)
+        if not form.is_valid():
+            return JsonResponse(
+                {'errors': form.errors}, status=HTTPStatus.BAD_REQUEST
+            )
+        note = form.save(commit=False)
+        note.author = self.request.user
+        note.save()
+        form.save_m2m()
+        response = JsonResponse(serialize_note(note), status=status)
+        response['Location'] = reverse('notes:api_detail', args=(note.slug,))
+        return response
+
+
+class ApiNoteList(ApiNoteBase):
+    """Список заметок постранично и создание заметки."""
+
+    @method_decorator(condition(list_etag, list_last_modified))
+    def get(self, request):
+        page, next_cursor = keyset_page(
+            self.get_queryset().only(*LIST_FIELDS),
+            get_cursor(request),
+            settings.NOTES_PAGE_SIZE,
+        )
+        return JsonResponse({
+            'results': [serialize_note(note, LIST_FIELDS) for note in page],
+            'next_cursor': next_cursor,
+        })
+
+    def post(self, request):
+        return self.save_form(parse_body(request), status=HTTPStatus.CREATED)
+
+
+class ApiNoteDetail(ApiNoteBase):
+    """Заметка: чтение, изменение и удаление."""
+
+    def get_object(self):
+        return get_object_or_404(self.get_queryset(), slug=self.kwargs['slug'])
+
+    @method_decorator(condition(detail_etag, detail_last_modified))
+    def get(self, request, slug):
+        return JsonResponse(serialize_note(self.get_object()))
+
+    def put(self, request, slug):
+        # Папка и метки не входят в представление заметки в API:
+        # PUT без них их не сбрасывает.
+        instance = self.get_object()
+        data = merge_current(parse_body(request), instance, RELATION_FIELDS)
+        return self.save_form(data, instance)
+
+    def patch(self, request, slug):
+        instance = self.get_object()
+        data = merge_current(
+            parse_body(request), instance, NoteForm.Meta.fields
+        )
+        return self.save_form(data, instance)
+
+    def delete(self, request, slug):
+        get_object_or_404(
+            self.get_queryset().for_delete(), slug=slug
+        ).delete()
+        return HttpResponse(status=HTTPStatus.NO_CONTENT)
+
+
+class ApiStats(ApiNoteBase):
+    """Сводка по заметкам пользователя."""
+
+    def get(self, request):
+        stats = get_stats(request.user)
+        last_modified = stats.last_modified
+        return JsonResponse({
+            'note_count': stats.note_count,
+            'text_bytes': stats.text_bytes,
+            'last_modified': last_modified and last_modified.isoformat(),
+        })
+
+
+class ApiSync(ApiNoteBase):
+    """Изменения заметок после номера since, порциями."""
+
+    def get(self, request):
+        try:
+            since = int(request.GET.get('since', -1))
+            limit = min(
+                int(request.GET.get('limit', settings.NOTES_SYNC_BATCH_SIZE)),
+                settings.NOTES_SYNC_BATCH_SIZE,
+            )
+        except ValueError:
+            return error('since и limit должны быть числами.',
+                         HTTPStatus.BAD_REQUEST)
+        if limit < 1:
+            return error('limit должен быть положительным.',
+                         HTTPStatus.BAD_REQUEST)
+        changed, deleted, last_seq, has_more = changes_since(
+            request.user, since, limit
+        )
+        return JsonResponse({
+            'changed': [
+                dict(serialize_note(note), change_seq=note.change_seq)
+                for note in changed
+            ],
+            'deleted': [
+                {
+                    'id': tombstone.note_id,
+                    'slug': tombstone.slug,
+                    'change_seq': tombstone.change_seq,
+                }
+                for tombstone in deleted
+            ],
+            'since': last_seq,
+            'has_more': has_more,
+        })
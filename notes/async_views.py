@@ -0,0 +1,121 @@
+import asyncio
+import contextvars
+import functools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import FileResponse
+
+from .metrics import render_timed
+
+
+@functools.lru_cache(maxsize=None)
+def get_executor():
+    """Отдельный ограниченный пул для запросов к базе из async-кода."""
+    return ThreadPoolExecutor(
+        max_workers=settings.NOTES_ASYNC_THREADS,
+        thread_name_prefix='notes-async',
+    )
+
+
+def call_with_connections(func, *args, **kwargs):
+    # Потоки пула живут дольше запроса: соединения с базой обслуживаем
+    # так же, как Django делает это по сигналам начала и конца запроса.
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """Выполняет синхронный код в пуле, не блокируя цикл событий.
+
+    Без пула (NOTES_ASYNC_THREADS = 0) - в общем потоке sync_to_async,
+    как обычные синхронные представления под ASGI.
+    """
+    if not settings.NOTES_ASYNC_THREADS:
+        return await sync_to_async(func)(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    # Контекст запроса (например, статистика метрик) нужен и в потоке пула.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(),
+        functools.partial(
+            context.run, call_with_connections, func, *args, **kwargs
+        ),
+    )
+
+
+def render_view(view, request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    if callable(getattr(response, 'render', None)):
+        render_timed(response)
+    return response
+
+
+def async_view(view):
+    """Асинхронная обёртка над синхронным представлением чтения.
+
+    В Django 3.2 нет асинхронного ORM, поэтому запросы к базе и рендеринг
+    уходят в пул, а не в единственный поток sync_to_async.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run_in_pool(render_view, view, request, *args, **kwargs)
+    return wrapper
+
+
+def read_view(view):
+    """Под ASGI (NOTES_ASYNC_VIEWS) представления чтения асинхронные."""
+    if settings.NOTES_ASYNC_VIEWS:
+        return async_view(view)
+    return view
+
+
+def spool_response(response):
+    """Тело потокового ответа во временном файле, с теми же заголовками.
+
+    В памяти держится не больше NOTES_STREAM_SPOOL_SIZE байт, остальное
+    уходит на диск.
+    """
+    spool = tempfile.SpooledTemporaryFile(
+        max_size=settings.NOTES_STREAM_SPOOL_SIZE
+    )
+    try:
+        for chunk in response.streaming_content:
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    finally:
+        response.close()
+    size = spool.tell()
+    spool.seek(0)
+    spooled = FileResponse(spool, status=response.status_code)
+    for header, value in response.items():
+        spooled[header] = value
+    spooled['Content-Length'] = size
+    spooled.cookies = response.cookies
+    return spooled
+
+
+def stream_view(view):
+    """Потоковый ответ представления, под ASGI переписанный в файл.
+
+    ASGIHandler Django 3.2 перебирает потоковый ответ прямо в цикле
+    событий, где запросы к базе запрещены. Поэтому под ASGI тело читается
+    ещё в потоке представления во временный файл, и цикл событий отдаёт
+    уже его; под WSGI ответ остаётся потоковым.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if response.streaming and isinstance(request, ASGIRequest):
+            return spool_response(response)
+        return response
+    return wrapper
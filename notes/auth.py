@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+USER_KEY = 'notes:user:{user_id}'
+CACHED_BACKEND = 'notes.auth.CachedModelBackend'
+# Бэкенды, с которыми создавались сессии до CachedModelBackend.
+LEGACY_BACKENDS = ('django.contrib.auth.backends.ModelBackend',)
+# Хеш пароля в кеш не попадает: для проверки сессии хватает
+# get_session_auth_hash, а поле password остаётся отложенным.
+SECRET_FIELDS = ('password',)
+
+
+def get_user_cache():
+    return caches[settings.NOTES_USER_CACHE_ALIAS]
+
+
+def remember_user(user):
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname not in SECRET_FIELDS
+    }
+    get_user_cache().set(
+        USER_KEY.format(user_id=user.pk),
+        {'fields': fields, 'session_hash': user.get_session_auth_hash()},
+        settings.NOTES_USER_CACHE_TIMEOUT,
+    )
+
+
+def load_user(cached):
+    """Пользователь из записи кеша, без хеша пароля."""
+    fields = cached['fields']
+    user = get_user_model().from_db(
+        DEFAULT_DB_ALIAS, list(fields), list(fields.values())
+    )
+    session_hash = cached['session_hash']
+    user.get_session_auth_hash = lambda: session_hash
+    return user
+
+
+def forget_user(user_id):
+    """Следующий запрос пользователя прочитает его из базы."""
+    get_user_cache().delete(USER_KEY.format(user_id=user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кеша.
+
+    Запись в кеше живёт NOTES_USER_CACHE_TIMEOUT секунд и удаляется при
+    любом сохранении пользователя (смена пароля, блокировка) и при выходе.
+    Кеш общий для всех процессов (проверка notes.E001), поэтому удаление
+    видят все воркеры.
+    """
+
+    def get_user(self, user_id):
+        cached = get_user_cache().get(USER_KEY.format(user_id=user_id))
+        if cached is not None:
+            return load_user(cached)
+        user = super().get_user(user_id)
+        if user is not None:
+            remember_user(user)
+        return user
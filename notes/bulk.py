@@ -0,0 +1,111 @@
+"""Пакетные операции над заметками автора.
+
+Выбранные заметки обрабатываются пачками по chunk_size, каждая пачка в
+своей транзакции: большая выборка не держит блокировку записи SQLite
+всё время операции.
+"""
+from functools import partial
+
+from django.db import transaction
+
+from .cache import bump_version
+from .functions import OctetLength
+from .imports import batched
+from .models import ChangeCounter, Note, NoteTombstone
+from .routers import pin_primary
+from .search import get_backend
+from .signals import mute_deletion_signals, shift_note_counts
+from .stats import shift_stats
+
+
+def count_by_folder(folder_ids, sign):
+    deltas = {}
+    for folder_id in folder_ids:
+        deltas[folder_id] = deltas.get(folder_id, 0) + sign
+    return deltas
+
+
+def delete_chunk(author, ids):
+    """Удаляет пачку одним DELETE и обновляет всё, что следит за заметками."""
+    notes = list(
+        Note.objects.filter(author=author, pk__in=ids)
+        .only('id', 'slug', 'folder')
+        .annotate(text_bytes=OctetLength('text'))
+    )
+    if not notes:
+        return 0
+    note_ids = [note.pk for note in notes]
+    # Из индекса FTS5 заметки вычёркиваются, пока их строки ещё есть.
+    get_backend().remove(note_ids)
+    with mute_deletion_signals():
+        Note.objects.filter(pk__in=note_ids).only('id').delete()
+    last_seq = ChangeCounter.objects.reserve(author.pk, count=len(notes))
+    first_seq = last_seq - len(notes) + 1
+    NoteTombstone.objects.bulk_create(
+        NoteTombstone(
+            author=author,
+            note_id=note.pk,
+            slug=note.slug,
+            change_seq=first_seq + index,
+        )
+        for index, note in enumerate(notes)
+    )
+    shift_note_counts(
+        count_by_folder((note.folder_id for note in notes), -1)
+    )
+    shift_stats(
+        author.pk,
+        notes=-len(notes),
+        text_bytes=-sum(note.text_bytes for note in notes),
+    )
+    return len(notes)
+
+
+def move_chunk(author, ids, folder):
+    notes = Note.objects.filter(author=author, pk__in=ids)
+    deltas = count_by_folder(notes.values_list('folder_id', flat=True), -1)
+    moved = notes.update(folder=folder)
+    if folder is not None:
+        deltas[folder.pk] = deltas.get(folder.pk, 0) + moved
+    shift_note_counts(deltas)
+    return moved
+
+
+def tag_chunk(author, ids, tag):
+    note_ids = list(Note.objects.filter(
+        author=author, pk__in=ids
+    ).values_list('id', flat=True))
+    Link = Note.tags.through
+    Link.objects.bulk_create(
+        (Link(note_id=note_id, tag_id=tag.pk) for note_id in note_ids),
+        ignore_conflicts=True,
+    )
+    return len(note_ids)
+
+
+def apply_in_chunks(operation, author, ids, chunk_size, *args):
+    """Применяет операцию к заметкам автора с данными id пачками.
+
+    Чужие и несуществующие id пропускаются. Возвращает число
+    обработанных заметок.
+    """
+    done = 0
+    for chunk in batched(sorted(set(ids)), chunk_size):
+        with transaction.atomic():
+            done += operation(author, chunk, *args)
+    if done:
+        transaction.on_commit(partial(bump_version, author.pk))
+        pin_primary(author.pk)
+    return done
+
+
+def bulk_delete(author, ids, chunk_size):
+    return apply_in_chunks(delete_chunk, author, ids, chunk_size)
+
+
+def bulk_move(author, ids, folder, chunk_size):
+    return apply_in_chunks(move_chunk, author, ids, chunk_size, folder)
+
+
+def bulk_tag(author, ids, tag, chunk_size):
+    return apply_in_chunks(tag_chunk, author, ids, chunk_size, tag)
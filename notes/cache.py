@@ -0,0 +1,109 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from . import metrics
+
+VERSION_KEY = 'notes:version:{author_id}'
+PAGE_KEY = 'notes:page:{author_id}:{version}:{path_hash}'
+
+
+def get_cache():
+    return caches[settings.NOTES_CACHE_ALIAS]
+
+
+def get_version_cache():
+    # Версии отдельно от страниц: переполнение кеша страниц не должно
+    # удалять версии, иначе вернулись бы страницы старой версии.
+    return caches[settings.NOTES_VERSION_CACHE_ALIAS]
+
+
+def new_version():
+    # Версия от времени, а не с единицы: если ключ версии вытеснят из кеша,
+    # новая версия не совпадёт со старыми записями страниц.
+    return time.time_ns() // 1000
+
+
+def get_version(author_id):
+    cache = get_version_cache()
+    key = VERSION_KEY.format(author_id=author_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(author_id):
+    """Инвалидирует все закешированные страницы автора."""
+    cache = get_version_cache()
+    key = VERSION_KEY.format(author_id=author_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_version(), timeout=None)
+
+
+def page_key(request, version):
+    # CSRF-токен в формах страницы годится только вместе со своей cookie,
+    # поэтому страницы с разными cookie кешируются отдельно.
+    csrf_secret = request.META.get('CSRF_COOKIE', '')
+    path_hash = hashlib.md5(
+        f'{request.get_full_path()}\n{csrf_secret}'.encode()
+    ).hexdigest()
+    return PAGE_KEY.format(
+        author_id=request.user.pk,
+        version=version,
+        path_hash=path_hash,
+    )
+
+
+def page_etag(request, *args, **kwargs):
+    """Тег ETag страницы без рендера: меняется вместе с версией кеша автора.
+
+    Версию сдвигает любая запись заметки, папки или метки после фиксации
+    транзакции, в общем для всех процессов кеше (проверка notes.E001),
+    поэтому совпавший ETag значит, что страница не менялась. Без версии
+    (кеш отключён) ETag не выдаётся.
+    """
+    version = get_version(request.user.pk)
+    if version is None:
+        return None
+    return hashlib.md5(page_key(request, version).encode()).hexdigest()
+
+
+class CachedPageMixin:
+    """Отдаёт страницу из кеша, пока заметки автора не менялись.
+
+    Клиенту с актуальной копией страницы отвечает 304 до шаблона и кеша.
+    """
+    cache_name = None
+
+    @method_decorator(condition(etag_func=page_etag))
+    def get(self, request, *args, **kwargs):
+        cache = get_cache()
+        version = get_version(request.user.pk)
+        content = cache.get(page_key(request, version))
+        if content is not None:
+            metrics.increment('notes_page_cache_hits_total',
+                              view=self.cache_name)
+            return HttpResponse(content)
+        metrics.increment('notes_page_cache_misses_total',
+                          view=self.cache_name)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            # Ключ считается после рендера: если шаблон выдал новую
+            # CSRF-cookie, страницу найдёт уже запрос с этой cookie.
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    page_key(request, version),
+                    response.content,
+                    settings.NOTES_CACHE_TIMEOUT,
+                )
+            )
+        return response
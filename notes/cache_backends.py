@@ -0,0 +1,25 @@
+"""Файловый кеш без обхода каталога на каждой записи."""
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class FileCache(FileBasedCache):
+    """FileBasedCache, который считает файлы раз в CULL_EVERY записей.
+
+    Django перед каждой записью перечисляет весь каталог кеша, чтобы
+    решить, не пора ли удалить случайную часть записей. Здесь это делается
+    раз в OPTIONS['CULL_EVERY'] записей процесса (по умолчанию 100), а
+    CULL_EVERY = None отключает удаление совсем: так хранятся версии
+    страниц и закрепления за основной базой, которые терять нельзя.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_every = params.get('OPTIONS', {}).get('CULL_EVERY', 100)
+        self._writes = 0
+
+    def _cull(self):
+        if self._cull_every is None:
+            return
+        self._writes += 1
+        if self._writes % self._cull_every == 0:
+            super()._cull()
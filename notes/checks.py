@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import get_storage_class
+
+# Настройки кешей, записи в которых должны видеть все процессы: иначе
+# сброс после записи доходит только до процесса, который её сделал.
+SHARED_CACHE_SETTINGS = (
+    'NOTES_CACHE_ALIAS', 'NOTES_VERSION_CACHE_ALIAS', 'NOTES_USER_CACHE_ALIAS',
+)
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+def shared_cache_settings():
+    names = list(SHARED_CACHE_SETTINGS)
+    # Сессия в кеше одного процесса не видна остальным, и выход из неё
+    # действует только в нём.
+    if settings.SESSION_ENGINE in CACHED_SESSION_ENGINES:
+        names.append('SESSION_CACHE_ALIAS')
+    # Закрепление автора за основной базой должен видеть воркер, который
+    # обслужит его следующий запрос.
+    if settings.NOTES_DB_REPLICAS:
+        names.append('NOTES_REPLICA_CACHE_ALIAS')
+    return names
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    if settings.NOTES_SINGLE_WORKER:
+        return []
+    errors = []
+    for name in shared_cache_settings():
+        alias = getattr(settings, name)
+        if isinstance(caches[alias], LocMemCache):
+            errors.append(Error(
+                f'{name} = {alias!r}: LocMemCache виден только одному '
+                'процессу.',
+                hint=(
+                    'Укажите общий кеш (FileBasedCache, Memcached, Redis) '
+                    'или NOTES_SINGLE_WORKER = True.'
+                ),
+                id='notes.E001',
+            ))
+    return errors
+
+
+@register(deploy=True)
+def check_static_manifest(app_configs, **kwargs):
+    # Без манифеста ManifestStaticFilesStorage при DEBUG = False роняет
+    # каждую страницу с тегом static.
+    if settings.DEBUG:
+        return []
+    storage = get_storage_class(settings.STATICFILES_STORAGE)()
+    if not isinstance(storage, ManifestFilesMixin):
+        return []
+    if storage.exists(storage.manifest_name):
+        return []
+    return [Error(
+        f'Нет манифеста статики {storage.path(storage.manifest_name)}.',
+        hint='Запустите python manage.py collectstatic перед запуском.',
+        id='notes.E002',
+    )]
+
+
+def require_static_manifest():
+    """Не даёт серверу стартовать без собранной статики.
+
+    Системные проверки под WSGI и ASGI не запускаются, поэтому
+    yanote.wsgi и yanote.asgi вызывают эту проверку сами.
+    """
+    for error in check_static_manifest(None):
+        raise ImproperlyConfigured(f'{error.msg} {error.hint}')
@@ -0,0 +1,80 @@
+import csv
+import json
+import zipfile
+
+from django.conf import settings
+
+from .models import Note
+
+EXPORT_FIELDS = ('title', 'slug', 'text')
+
+
+class EchoBuffer:
+    """Файлоподобный объект, который сразу возвращает записанное."""
+
+    def write(self, value):
+        return value
+
+
+class ZipBuffer:
+    """Несмещаемый поток для zipfile, который отдаёт данные порциями."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_jsonl(notes):
+    for note in notes:
+        record = {field: getattr(note, field) for field in EXPORT_FIELDS}
+        yield (json.dumps(record, ensure_ascii=False) + '\n').encode()
+
+
+def iter_csv(notes):
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow(EXPORT_FIELDS).encode()
+    for note in notes:
+        row = [getattr(note, field) for field in EXPORT_FIELDS]
+        yield writer.writerow(row).encode()
+
+
+def iter_markdown_zip(notes):
+    buffer = ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for note in notes:
+            with archive.open(f'{note.slug}.md', 'w') as member:
+                member.write(f'# {note.title}\n\n{note.text}\n'.encode())
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+# Формат: (генератор, content type, расширение файла).
+FORMATS = {
+    'jsonl': (iter_jsonl, 'application/x-ndjson', 'jsonl'),
+    'csv': (iter_csv, 'text/csv; charset=utf-8', 'csv'),
+    'zip': (iter_markdown_zip, 'application/zip', 'zip'),
+}
+
+
+def export_notes(author, export_format, chunk_size=None):
+    """Генератор байтов выгрузки заметок автора в заданном формате."""
+    chunk_size = chunk_size or settings.NOTES_EXPORT_CHUNK_SIZE
+    notes = (
+        Note.objects.filter(author=author)
+        .only(*EXPORT_FIELDS)
+        .order_by('id')
+        .iterator(chunk_size=chunk_size)
+    )
+    iterator, _, _ = FORMATS[export_format]
+    return iterator(notes)
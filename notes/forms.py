@@ -1,11 +1,7 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
-from .models import Note
-
-WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
+from .models import WARNING, Folder, Note, Tag  # noqa: F401
 
 
 class NoteForm(forms.ModelForm):
@@ -13,17 +9,99 @@ class NoteForm(forms.ModelForm):
 
     class Meta:
         model = Note
-        fields = ('title', 'text', 'slug')
+        fields = ('title', 'text', 'slug', 'folder', 'tags')
+
+    def __init__(self, *args, author=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Папки и метки предлагаются только свои.
+        self.fields['folder'].queryset = Folder.objects.filter(author=author)
+        self.fields['tags'].queryset = Tag.objects.filter(author=author)
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
+        """Пустой slug подберёт Note.save по заголовку.
+
+        None избавляет от проверки уникальности; явный slug проверит
+        validate_unique модели, с сообщением из Note.unique_error_message.
+        """
+        return self.cleaned_data.get('slug') or None
+
+
+class LabelForm(forms.ModelForm):
+    """Название папки или метки, уникальное среди своих."""
+
+    def __init__(self, *args, author=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.author = author
+
+    def clean_name(self):
+        # UniqueConstraint модели Django 3.2 в формах не проверяет.
+        name = self.cleaned_data['name']
+        if self._meta.model.objects.filter(
+            author=self.author, name=name
+        ).exclude(pk=self.instance.pk).exists():
+            raise ValidationError(f'{name} - такое название уже есть.')
+        return name
+
+
+class FolderForm(LabelForm):
+
+    class Meta:
+        model = Folder
+        fields = ('name',)
+
+
+class TagForm(LabelForm):
+
+    class Meta:
+        model = Tag
+        fields = ('name',)
+
+
+class IdListField(forms.Field):
+    """Список id из повторяющегося параметра формы."""
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return sorted({int(item) for item in value or ()})
+        except (TypeError, ValueError):
+            raise ValidationError('Некорректный список заметок.')
+
+
+class NoteBulkForm(forms.Form):
+    """Действие над несколькими выбранными заметками."""
+    DELETE = 'delete'
+    MOVE = 'move'
+    TAG = 'tag'
+
+    action = forms.ChoiceField(
+        label='Действие',
+        choices=(
+            (DELETE, 'Удалить'),
+            (MOVE, 'Переместить в папку'),
+            (TAG, 'Добавить метку'),
+        ),
+    )
+    notes = IdListField(error_messages={'required': 'Выберите заметки.'})
+    folder = forms.ModelChoiceField(
+        Folder.objects.none(),
+        required=False,
+        label='Папка',
+        empty_label='Без папки',
+    )
+    tag = forms.ModelChoiceField(
+        Tag.objects.none(), required=False, label='Метка'
+    )
+
+    def __init__(self, *args, author=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['folder'].queryset = Folder.objects.filter(author=author)
+        self.fields['tag'].queryset = Tag.objects.filter(author=author)
+
+    def clean(self):
         cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+        if cleaned_data.get('action') == self.TAG and not cleaned_data.get(
+            'tag'
+        ):
+            self.add_error('tag', 'Выберите метку.')
+        return cleaned_data
@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class OctetLength(models.Func):
+    """Длина текста в байтах, а не в символах."""
+    function = 'OCTET_LENGTH'
+    output_field = models.BigIntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='LENGTH(CAST(%(expressions)s AS BLOB))',
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, function='LENGTH', **extra_context
+        )
@@ -0,0 +1,126 @@
+import csv
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .models import SLUG_ATTEMPTS, ChangeCounter, Note
+from .signals import notes_bulk_created
+from .slugs import allocate_slugs
+
+IMPORT_FIELDS = ('title', 'text', 'slug')
+
+
+def read_jsonl(lines):
+    """Записи JSONL; битая строка или не объект даёт None.
+
+    Такие строки отбраковывает build_notes: одна ошибка в файле не
+    обрывает загрузку после уже сохранённых пачек.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield record if isinstance(record, dict) else None
+
+
+def read_csv(lines):
+    yield from csv.DictReader(lines)
+
+
+READERS = {'jsonl': read_jsonl, 'csv': read_csv}
+
+
+def batched(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_notes(author, records):
+    """Проверяет поля записей; возвращает заметки и число отбракованных."""
+    notes, rejected = [], 0
+    for record in records:
+        if record is None:
+            rejected += 1
+            continue
+        note = Note(
+            author=author,
+            **{field: record.get(field) or '' for field in IMPORT_FIELDS},
+        )
+        # Явный slug проверяется как в форме; пустой подберётся по заголовку.
+        exclude = ('author',) if note.slug else ('author', 'slug')
+        try:
+            note.clean_fields(exclude=exclude)
+        except ValidationError:
+            rejected += 1
+            continue
+        note.render_text()
+        notes.append(note)
+    return notes, rejected
+
+
+def insert_batch(notes):
+    """Подбирает slug пачке и вставляет её одним bulk_create.
+
+    Заметки с уже занятым явным slug пропускаются, как и в форме.
+    Возвращает сохранённые заметки.
+    """
+    explicit = [note.slug for note in notes]
+    for attempt in range(SLUG_ATTEMPTS):
+        slugs = allocate_slugs(
+            Note, [(note.title, slug) for note, slug in zip(notes, explicit)]
+        )
+        batch = []
+        for note, slug in zip(notes, slugs):
+            if slug is not None:
+                note.slug = slug
+                batch.append(note)
+        try:
+            with transaction.atomic():
+                if batch:
+                    last_seq = ChangeCounter.objects.reserve(
+                        batch[0].author_id, len(batch)
+                    )
+                    for seq, note in enumerate(batch, last_seq - len(batch)):
+                        note.change_seq = seq + 1
+                Note.objects.bulk_create(batch)
+                # SQLite не возвращает pk из bulk_create: добираем по slug.
+                ids = dict(
+                    Note.objects.filter(
+                        slug__in=[note.slug for note in batch]
+                    ).values_list('slug', 'id')
+                )
+                for note in batch:
+                    note.pk = ids[note.slug]
+                notes_bulk_created.send(sender=Note, notes=batch)
+            return batch
+        except IntegrityError:
+            # Кто-то параллельно занял подобранный slug: подбираем заново.
+            if attempt == SLUG_ATTEMPTS - 1:
+                raise
+
+
+def import_notes(author, lines, import_format, batch_size, report=None):
+    """Потоково загружает заметки; report(imported, rejected, rate)."""
+    started = time.monotonic()
+    imported = rejected = 0
+    records = READERS[import_format](lines)
+    for records_batch in batched(records, batch_size):
+        notes, invalid = build_notes(author, records_batch)
+        saved = insert_batch(notes) if notes else []
+        imported += len(saved)
+        rejected += invalid + len(notes) - len(saved)
+        if report is not None:
+            elapsed = time.monotonic() - started
+            report(imported, rejected, imported / elapsed if elapsed else 0)
+    return imported, rejected
@@ -0,0 +1,38 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.export import FORMATS, export_notes
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя в JSONL, CSV или zip с Markdown.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('author', help='Имя пользователя.')
+        parser.add_argument(
+            '--format', choices=tuple(FORMATS), default='jsonl',
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.',
+        )
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['author'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["author"]} не найден.'
+            )
+        chunks = export_notes(
+            author, options['format'], options['chunk_size']
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(chunks)
+        else:
+            sys.stdout.buffer.writelines(chunks)
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.imports import READERS, import_notes
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Загружает заметки пользователя из JSONL или CSV пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('author', help='Имя пользователя.')
+        parser.add_argument('path', help='Файл с заметками или - для stdin.')
+        parser.add_argument(
+            '--format', choices=tuple(READERS),
+            help='По умолчанию определяется по расширению файла.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.NOTES_IMPORT_BATCH_SIZE,
+            help='Сколько заметок вставлять в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['author'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["author"]} не найден.'
+            )
+        path = options['path']
+        import_format = options['format'] or Path(path).suffix.lstrip('.')
+        if import_format not in READERS:
+            raise CommandError('Укажите формат: --format jsonl или csv.')
+        if path == '-':
+            imported, rejected = self.load(author, sys.stdin, import_format,
+                                           options)
+        else:
+            with open(path, encoding='utf-8', newline='') as lines:
+                imported, rejected = self.load(author, lines, import_format,
+                                               options)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено заметок: {imported}, пропущено: {rejected}'
+        ))
+
+    def load(self, author, lines, import_format, options):
+        return import_notes(
+            author, lines, import_format, options['batch_size'],
+            report=self.report if options['verbosity'] > 0 else None,
+        )
+
+    def report(self, imported, rejected, rate):
+        self.stdout.write(
+            f'Загружено {imported}, пропущено {rejected}, '
+            f'{rate:.0f} заметок/с'
+        )
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from notes.imports import batched
+from notes.models import Note
+from notes.revisions import prune_revisions
+
+
+class Command(BaseCommand):
+    help = 'Удаляет старые версии заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=settings.NOTES_REVISION_KEEP,
+            help='Сколько последних версий оставлять каждой заметке.',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Оставлять и все версии моложе этого числа дней.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.NOTES_REVISION_BATCH_SIZE,
+            help='Историю скольких заметок разбирать за один проход.',
+        )
+
+    def handle(self, *args, **options):
+        keep = options['keep']
+        if keep < 1:
+            raise CommandError('--keep должен быть не меньше 1.')
+        before = None
+        if options['days'] is not None:
+            before = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+        note_ids = Note.objects.order_by('pk').values_list('pk', flat=True)
+        deleted = 0
+        for batch in batched(note_ids.iterator(batch_size), batch_size):
+            deleted += prune_revisions(batch, keep, before)
+        self.stdout.write(f'Удалено версий: {deleted}')
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.imports import batched
+from notes.models import Note
+from notes.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс по всем заметкам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.NOTES_SEARCH_CHUNK_SIZE,
+            help='Сколько заметок читать из базы за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        notes = Note.objects.only('id', 'author_id', 'title', 'text')
+        indexed = 0
+        chunk_size = options['chunk_size']
+        with transaction.atomic():
+            backend.clear()
+            for batch in batched(notes.iterator(chunk_size), chunk_size):
+                backend.index_many(batch)
+                indexed += len(batch)
+        self.stdout.write(f'Проиндексировано заметок: {indexed}')
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from notes.imports import batched
+from notes.stats import recompute_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сводки авторов по таблице заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.NOTES_STATS_BATCH_SIZE,
+            help='Скольких авторов пересчитывать в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        author_ids = get_user_model().objects.order_by('pk').values_list(
+            'pk', flat=True
+        )
+        batch_size = options['batch_size']
+        authors = 0
+        for batch in batched(author_ids.iterator(batch_size), batch_size):
+            recompute_stats(batch)
+            authors += len(batch)
+        self.stdout.write(f'Пересчитано сводок: {authors}')
@@ -0,0 +1,47 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_database(source, target_path, pages):
+    """Копирует базу SQLite в файл через backup API, по pages страниц."""
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=pages)
+    finally:
+        target.close()
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite в файлы реплик NOTES_DB_REPLICAS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=1024,
+            help='Сколько страниц копировать за шаг; 0 - всё за один шаг.',
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Основная база не SQLite.')
+        if not settings.NOTES_DB_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте NOTES_REPLICA_DBS.'
+            )
+        primary.ensure_connection()
+        pages = options['pages'] or -1
+        for alias in settings.NOTES_DB_REPLICAS:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                raise CommandError(f'Реплика {alias} не SQLite.')
+            # Открытое соединение реплики держало бы старый снимок файла.
+            replica.close()
+            copy_database(
+                primary.connection, replica.settings_dict['NAME'], pages
+            )
+            self.stdout.write(f'{alias}: {replica.settings_dict["NAME"]}')
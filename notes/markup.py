@@ -0,0 +1,50 @@
+import hashlib
+import html
+import re
+from urllib.parse import urlsplit
+
+import markdown
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import AMP_SUBSTITUTE
+
+EXTENSIONS = ('fenced_code', 'tables', 'sane_lists')
+SAFE_SCHEMES = ('', 'http', 'https', 'mailto')
+URL_JUNK = re.compile(r'[\x00-\x20]')
+
+
+def url_scheme(url):
+    """Схема URL так, как её прочтёт браузер.
+
+    Сущности в атрибуте браузер раскрывает (&#106;avascript:, &colon;),
+    а управляющие символы и пробелы в схеме пропускает.
+    """
+    url = html.unescape(url.replace(AMP_SUBSTITUTE, '&'))
+    return urlsplit(URL_JUNK.sub('', url)).scheme
+
+
+class SafeLinks(Treeprocessor):
+    """Убирает ссылки и картинки со схемами вроде javascript:."""
+
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ('href', 'src'):
+                url = element.get(attribute)
+                if url is None:
+                    continue
+                if url_scheme(url).lower() not in SAFE_SCHEMES:
+                    element.set(attribute, '#')
+
+
+def text_hash(text):
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def render_markdown(text):
+    """HTML из Markdown; сырой HTML в тексте экранируется."""
+    # Экземпляр Markdown хранит состояние разбора, поэтому не делим его
+    # между потоками.
+    md = markdown.Markdown(extensions=EXTENSIONS, output_format='html')
+    md.preprocessors.deregister('html_block')
+    md.inlinePatterns.deregister('html')
+    md.treeprocessors.register(SafeLinks(md), 'safe_links', 0)
+    return md.convert(text)
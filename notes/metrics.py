@@ -0,0 +1,133 @@
+import bisect
+import contextvars
+import threading
+import time
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+# Ключ -> [счётчики по корзинам..., сумма, количество].
+_histograms = {}
+_buckets = {}
+
+DURATION_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Статистика запроса, который сейчас обрабатывается (None - не в выборке).
+current_stats = contextvars.ContextVar('notes_request_stats', default=None)
+
+
+class RequestStats:
+    """Запросы к базе и время рендеринга в рамках одного HTTP-запроса."""
+    __slots__ = ('queries', 'db_time', 'render_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка выполнения SQL: считает запросы и время в базе."""
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def render_timed(response):
+    """Рендерит шаблонный ответ, учитывая время в статистике запроса."""
+    started = time.perf_counter()
+    response.render()
+    stats = current_stats.get()
+    if stats is not None:
+        stats.render_time += time.perf_counter() - started
+    return response
+
+
+def metric_key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def increment(name, **labels):
+    """Увеличивает счётчик процесса с набором меток."""
+    key = metric_key(name, labels)
+    with _lock:
+        _counters[key] += 1
+
+
+def get_counter(name, **labels):
+    return _counters.get(metric_key(name, labels), 0)
+
+
+def observe(name, value, buckets, **labels):
+    """Добавляет значение в гистограмму с заданными границами корзин."""
+    key = metric_key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(buckets) + 2)
+            _buckets[name] = buckets
+        index = bisect.bisect_left(buckets, value)
+        if index < len(buckets):
+            histogram[index] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+
+def get_histogram(name, **labels):
+    """Сумма и количество наблюдений гистограммы."""
+    histogram = _histograms.get(metric_key(name, labels))
+    if histogram is None:
+        return 0, 0
+    return histogram[-2], histogram[-1]
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def render():
+    """Счётчики и гистограммы в текстовом формате Prometheus."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(
+            (key, list(values)) for key, values in _histograms.items()
+        )
+    lines, typed = [], set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f'# TYPE {name} counter')
+        lines.append(f'{name}{format_labels(labels)} {value}')
+    for (name, labels), values in histograms:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f'# TYPE {name} histogram')
+        cumulative = 0
+        for bound, count in zip(_buckets[name], values):
+            cumulative += count
+            bucket_labels = format_labels(labels + (('le', bound),))
+            lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+        inf_labels = format_labels(labels + (('le', '+Inf'),))
+        lines.append(f'{name}_bucket{inf_labels} {values[-1]}')
+        lines.append(f'{name}_sum{format_labels(labels)} {values[-2]}')
+        lines.append(f'{name}_count{format_labels(labels)} {values[-1]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,166 @@
+import asyncio
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from . import metrics
+from .auth import CACHED_BACKEND, LEGACY_BACKENDS
+from .storage import accepted_encodings, brotli
+
+COMPRESSED_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'image/svg+xml',
+)
+
+
+class PerformanceMiddleware(MiddlewareMixin):
+    """Время, запросы к базе, рендеринг и размер ответа по представлениям.
+
+    Замеряется доля запросов NOTES_METRICS_SAMPLE_RATE; остальные проходят
+    без накладных расходов. Результаты - гистограммы в notes:metrics.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            stats = metrics.current_stats.get()
+            metrics.current_stats.reset(token)
+        self.finish(request, response, stats, started)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stats = metrics.current_stats.get()
+            metrics.current_stats.reset(token)
+        self.finish(request, response, stats, started)
+        return response
+
+    def process_template_response(self, request, response):
+        # Middleware стоит первым и вызывается последним: рендерим сами,
+        # чтобы засечь время шаблона.
+        if (metrics.current_stats.get() is not None
+                and isinstance(response, SimpleTemplateResponse)
+                and not response.is_rendered):
+            metrics.render_timed(response)
+        return response
+
+    def sampled(self):
+        return random.random() < settings.NOTES_METRICS_SAMPLE_RATE
+
+    def start(self):
+        token = metrics.current_stats.set(metrics.RequestStats())
+        return token, time.perf_counter()
+
+    def finish(self, request, response, stats, started):
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.observe('notes_request_duration_seconds', duration,
+                        metrics.DURATION_BUCKETS, view=view)
+        metrics.observe('notes_request_db_queries', stats.queries,
+                        metrics.QUERY_BUCKETS, view=view)
+        metrics.observe('notes_request_db_seconds', stats.db_time,
+                        metrics.DURATION_BUCKETS, view=view)
+        metrics.observe('notes_request_render_seconds', stats.render_time,
+                        metrics.DURATION_BUCKETS, view=view)
+        if not response.streaming:
+            metrics.observe('notes_response_size_bytes',
+                            len(response.content), metrics.SIZE_BUCKETS,
+                            view=view)
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor()
+    for item in sequence:
+        chunk = compressor.process(item) + compressor.flush()
+        if chunk:
+            yield chunk
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает текстовые ответы brotli или gzip, что примет клиент.
+
+    Ответы меньше NOTES_COMPRESS_MIN_SIZE байт отдаются как есть: сжатие
+    их почти не уменьшает. Потоковые ответы сжимаются на лету.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith(
+                COMPRESSED_TYPES
+            )
+        ):
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.NOTES_COMPRESS_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if 'br' in accepted and brotli is not None:
+            encoding = 'br'
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+        else:
+            return response
+        if response.streaming:
+            compress = (
+                brotli_sequence if encoding == 'br' else compress_sequence
+            )
+            response.streaming_content = compress(response.streaming_content)
+            del response['Content-Length']
+        else:
+            content = response.content
+            compressed = (
+                brotli.compress(content, quality=5) if encoding == 'br'
+                else compress_string(content)
+            )
+            if len(compressed) >= len(content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатое тело уже не совпадает побайтно: ETag становится слабым.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class SessionBackendMiddleware(MiddlewareMixin):
+    """Переводит сессии, созданные с ModelBackend, на CachedModelBackend.
+
+    Django пускает сессию, только если её бэкенд есть в
+    AUTHENTICATION_BACKENDS. Без этого после выкладки CachedModelBackend
+    все, кто вошёл раньше, оказались бы разлогинены, а с ModelBackend в
+    списке неудачный вход хешировал бы пароль дважды.
+    """
+
+    def process_request(self, request):
+        session = request.session
+        if session.get(BACKEND_SESSION_KEY) in LEGACY_BACKENDS:
+            session[BACKEND_SESSION_KEY] = CACHED_BACKEND
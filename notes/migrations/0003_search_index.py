@@ -0,0 +1,73 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+FTS_TABLE = 'notes_note_fts'
+
+
+def create_search_index(apps, schema_editor):
+    """На SQLite заводит таблицу FTS5 и наполняет её существующими заметками.
+
+    Для остальных СУБД индекс строится в таблице SearchToken.
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, text)'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'SELECT id, title, text FROM notes_note'
+        )
+        return
+    from collections import Counter
+
+    from notes.search import TITLE_WEIGHT, tokenize
+
+    Note = apps.get_model('notes', 'Note')
+    SearchToken = apps.get_model('notes', 'SearchToken')
+    for note in Note.objects.iterator(chunk_size=2000):
+        weights = Counter(tokenize(note.text))
+        for token in tokenize(note.title):
+            weights[token] += TITLE_WEIGHT
+        SearchToken.objects.bulk_create(
+            SearchToken(author_id=note.author_id, note_id=note.pk,
+                        token=token, weight=weight)
+            for token, weight in weights.items()
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='notes.note')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchtoken',
+            index=models.Index(fields=['author', 'token'], name='notes_searchtoken_author_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchtoken',
+            constraint=models.UniqueConstraint(fields=('note', 'token'), name='notes_searchtoken_note_token_uniq'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def number_existing_notes(apps, schema_editor):
+    """Нумерует уже созданные заметки каждого автора по порядку id."""
+    Note = apps.get_model('notes', 'Note')
+    ChangeCounter = apps.get_model('notes', 'ChangeCounter')
+    author_ids = Note.objects.values_list('author_id', flat=True).distinct()
+    for author_id in author_ids:
+        seq = 0
+        notes = Note.objects.filter(author_id=author_id).order_by('id')
+        for note_id in notes.values_list('id', flat=True).iterator():
+            seq += 1
+            Note.objects.filter(id=note_id).update(change_seq=seq)
+        ChangeCounter.objects.create(author_id=author_id, value=seq)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0004_note_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='auth.user')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NoteTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note_id', models.BigIntegerField()),
+                ('slug', models.SlugField(max_length=100)),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, verbose_name='Номер изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'change_seq'], name='notes_note_author_seq_idx'),
+        ),
+        migrations.AddField(
+            model_name='notetombstone',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notetombstone',
+            index=models.Index(fields=['author', 'change_seq'], name='notes_tombstone_author_seq_idx'),
+        ),
+        migrations.RunPython(number_existing_notes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+from notes.markup import render_markdown, text_hash
+
+
+def render_existing_notes(apps, schema_editor):
+    """Рендерит HTML уже созданных заметок."""
+    Note = apps.get_model('notes', 'Note')
+    notes = Note.objects.only('id', 'text').order_by('id')
+    for note in notes.iterator(chunk_size=500):
+        Note.objects.filter(id=note.id).update(
+            text_html=render_markdown(note.text),
+            text_hash=text_hash(note.text),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_change_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='text_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='Хеш текста'),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(render_existing_notes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:20
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+import django.db.models.deletion
+
+from notes.functions import OctetLength
+
+
+def fill_author_stats(apps, schema_editor):
+    """Считает сводки авторов, у которых уже есть заметки."""
+    Note = apps.get_model('notes', 'Note')
+    AuthorStats = apps.get_model('notes', 'AuthorStats')
+    rows = Note.objects.values('author_id').annotate(
+        note_count=Count('id'),
+        text_bytes=Sum(OctetLength('text')),
+        last_modified=Max('updated'),
+    ).order_by()
+    AuthorStats.objects.bulk_create(
+        (AuthorStats(**row) for row in rows.iterator()), batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('notes', '0007_folders_and_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='note_stats', serialize=False, to='auth.user')),
+                ('note_count', models.PositiveIntegerField(default=0, verbose_name='Заметок')),
+                ('text_bytes', models.PositiveBigIntegerField(default=0, verbose_name='Байт текста')),
+                ('last_modified', models.DateTimeField(blank=True, null=True, verbose_name='Последнее изменение')),
+            ],
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from notes.revisions import pack_text
+
+
+def snapshot_existing_notes(apps, schema_editor):
+    """Первая версия уже созданных заметок — их текущий текст."""
+    Note = apps.get_model('notes', 'Note')
+    NoteRevision = apps.get_model('notes', 'NoteRevision')
+    notes = Note.objects.only('id', 'text').order_by('id')
+    NoteRevision.objects.bulk_create(
+        (
+            NoteRevision(
+                note_id=note.id,
+                number=1,
+                base=1,
+                data=pack_text(note.text),
+                text_bytes=len(note.text.encode()),
+            )
+            for note in notes.iterator(chunk_size=500)
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0008_author_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер версии')),
+                ('base', models.PositiveIntegerField(verbose_name='Номер снимка')),
+                ('data', models.BinaryField(verbose_name='Сжатые данные')),
+                ('text_bytes', models.PositiveIntegerField(verbose_name='Байт текста')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='notes.note')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='noterevision',
+            constraint=models.UniqueConstraint(fields=('note', 'number'), name='notes_revision_note_number_uniq'),
+        ),
+        migrations.RunPython(snapshot_existing_notes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0009_note_revisions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='searchtoken',
+            index=models.Index(fields=['token', 'note'], name='notes_searchtoken_token_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from notes.markup import render_markdown
+
+
+def rerender_entity_links(apps, schema_editor):
+    """Перерисовывает HTML заметок, где ссылка могла спрятать схему в &...;."""
+    Note = apps.get_model('notes', 'Note')
+    notes = Note.objects.filter(text__contains='&').only('id', 'text')
+    for note in notes.order_by('id').iterator(chunk_size=500):
+        Note.objects.filter(pk=note.pk).update(
+            text_html=render_markdown(note.text)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0010_searchtoken_token_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(rerender_entity_links, migrations.RunPython.noop),
+    ]
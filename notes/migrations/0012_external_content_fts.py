@@ -0,0 +1,41 @@
+from django.db import migrations
+
+FTS_TABLE = 'notes_note_fts'
+
+
+def use_external_content(apps, schema_editor):
+    """Индекс FTS5 без своей копии текста: слова берутся из notes_note."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE {FTS_TABLE}')
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+        "title, text, content='notes_note', content_rowid='id')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"
+    )
+
+
+def use_own_content(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE {FTS_TABLE}')
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, text)'
+    )
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+        'SELECT id, title, text FROM notes_note'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0011_rerender_entity_links'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_external_content, use_own_content),
+    ]
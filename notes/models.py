@@ -1,7 +1,93 @@
 from django.conf import settings
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Length, Substr
 
-from pytils.translit import slugify
+from .markup import render_markdown, text_hash
+from .slugs import allocate_slug
+
+SLUG_ATTEMPTS = 5
+WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
+# Поля, которые меняются при любом сохранении, даже с update_fields.
+TRACKED_FIELDS = ('updated', 'change_seq')
+# Поля, которые пересчитываются вместе с текстом.
+RENDERED_FIELDS = ('text_html', 'text_hash')
+
+
+class NoteQuerySet(models.QuerySet):
+    """Выборки заметок только с теми полями, что нужны странице."""
+
+    def for_list(self):
+        return self.only('id', 'slug', 'title')
+
+    def for_detail(self):
+        """Без текста: HTML встраивается, только если он не слишком длинный."""
+        inline = When(
+            body_size__lte=settings.NOTES_TEXT_INLINE_LIMIT,
+            then='text_html',
+        )
+        return self.defer('text', 'text_html').annotate(
+            body_size=Length('text_html'),
+        ).annotate(
+            body_html=Case(
+                inline, default=Value(''), output_field=models.TextField()
+            ),
+            preview=Substr('text', 1, settings.NOTES_TEXT_PREVIEW_SIZE),
+        )
+
+    def for_edit(self):
+        return self.defer('text_html')
+
+    def for_delete(self):
+        """Начало текста для подтверждения и поля для сигналов удаления."""
+        return self.only('id', 'slug', 'title', 'author', 'folder').annotate(
+            preview=Substr('text', 1, settings.NOTES_TEXT_PREVIEW_SIZE),
+        )
+
+
+class Folder(models.Model):
+    """Папка заметок автора; у заметки не больше одной папки."""
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    name = models.CharField('Название', max_length=100)
+    # Поддерживается сигналами при сохранении и удалении заметок.
+    note_count = models.PositiveIntegerField('Заметок', default=0)
+
+    class Meta:
+        ordering = ('name',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('author', 'name'),
+                name='notes_folder_author_name_uniq',
+            ),
+        )
+
+    def __str__(self):
+        return self.name
+
+
+class Tag(models.Model):
+    """Метка заметок автора."""
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    name = models.CharField('Название', max_length=50)
+
+    class Meta:
+        ordering = ('name',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('author', 'name'),
+                name='notes_tag_author_name_uniq',
+            ),
+        )
+
+    def __str__(self):
+        return self.name
 
 
 class Note(models.Model):
@@ -15,6 +101,13 @@ class Note(models.Model):
         'Текст',
         help_text='Добавьте подробностей'
     )
+    text_html = models.TextField('Текст в HTML', blank=True, editable=False)
+    text_hash = models.CharField(
+        'Хеш текста',
+        max_length=32,
+        blank=True,
+        editable=False,
+    )
     slug = models.SlugField(
         'Адрес для страницы с заметкой',
         max_length=100,
@@ -27,12 +120,243 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    updated = models.DateTimeField('Изменена', auto_now=True)
+    change_seq = models.BigIntegerField('Номер изменения', default=0)
+    folder = models.ForeignKey(
+        Folder,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notes',
+        verbose_name='Папка',
+    )
+    tags = models.ManyToManyField(
+        Tag,
+        blank=True,
+        related_name='notes',
+        verbose_name='Метки',
+    )
+
+    objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'id'),
+                name='notes_note_author_id_idx',
+            ),
+            models.Index(
+                fields=('author', 'updated'),
+                name='notes_note_author_updated_idx',
+            ),
+            models.Index(
+                fields=('author', 'change_seq'),
+                name='notes_note_author_seq_idx',
+            ),
+            models.Index(
+                fields=('folder', 'id'),
+                name='notes_note_folder_id_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    def unique_error_message(self, model_class, unique_check):
+        if unique_check == ('slug',):
+            return ValidationError(self.slug + WARNING, code='unique')
+        return super().unique_error_message(model_class, unique_check)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Папка, заголовок и размер текста на момент загрузки: по ним
+        # сигналы пересчитают счётчики папок, поисковый индекс и
+        # статистику автора.
+        if 'folder_id' in field_names:
+            instance.loaded_folder_id = values[field_names.index('folder_id')]
+        if 'title' in field_names:
+            instance.loaded_title = values[field_names.index('title')]
+        if 'text' in field_names:
+            instance.loaded_text_bytes = len(
+                values[field_names.index('text')].encode()
+            )
+        return instance
+
+    def render_text(self):
+        """Обновляет HTML текста, если текст изменился с прошлого раза."""
+        digest = text_hash(self.text)
+        if digest == self.text_hash:
+            return False
+        self.text_html = render_markdown(self.text)
+        self.text_hash = digest
+        return True
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        text_saved = update_fields is None or 'text' in update_fields
+        # По text_changed сигнал решает, записывать ли новую версию.
+        self.text_changed = False
+        if text_saved and 'text' not in self.get_deferred_fields():
+            self.text_changed = self.render_text()
+            if self.text_changed and update_fields is not None:
+                update_fields = {*update_fields, *RENDERED_FIELDS}
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *TRACKED_FIELDS}
+        with transaction.atomic():
+            # Номер изменения берётся в транзакции записи: блокировка
+            # счётчика автора упорядочивает номера так же, как коммиты.
+            self.change_seq = ChangeCounter.objects.reserve(self.author_id)
+            if self.slug:
+                return super().save(*args, **kwargs)
+            self.save_with_new_slug(*args, **kwargs)
+
+    def save_with_new_slug(self, *args, **kwargs):
+        # Параллельная запись может занять тот же slug между подбором и
+        # вставкой: уникальный индекс это поймает, подбираем заново.
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = allocate_slug(Note, self.title, exclude_pk=self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                slug_taken = Note.objects.filter(
+                    slug=self.slug
+                ).exclude(pk=self.pk).exists()
+                if not slug_taken or attempt == SLUG_ATTEMPTS - 1:
+                    raise
+
+
+class SearchToken(models.Model):
+    """Слово заметки в инвертированном индексе для поиска."""
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='search_tokens',
+    )
+    token = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'token'),
+                name='notes_searchtoken_note_token_uniq',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('author', 'token'),
+                name='notes_searchtoken_author_idx',
+            ),
+            # Поиск по всем авторам из админки.
+            models.Index(
+                fields=('token', 'note'),
+                name='notes_searchtoken_token_idx',
+            ),
+        )
+
+
+class ChangeCounterManager(models.Manager):
+
+    def reserve(self, author_id, count=1):
+        """Резервирует count номеров изменений автора, возвращает последний.
+
+        Вызывать внутри транзакции записи: строка счётчика остаётся
+        заблокированной до коммита.
+        """
+        with transaction.atomic():
+            if not self.filter(author_id=author_id).update(
+                value=F('value') + count
+            ):
+                try:
+                    with transaction.atomic():
+                        self.create(author_id=author_id, value=count)
+                    return count
+                except IntegrityError:
+                    self.filter(author_id=author_id).update(
+                        value=F('value') + count
+                    )
+            return self.filter(author_id=author_id).values_list(
+                'value', flat=True
+            ).get()
+
+
+class ChangeCounter(models.Model):
+    """Последний номер изменения заметок автора для синхронизации."""
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    value = models.BigIntegerField(default=0)
+
+    objects = ChangeCounterManager()
+
+
+class NoteTombstone(models.Model):
+    """След удалённой заметки, чтобы клиенты узнали об удалении."""
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    note_id = models.BigIntegerField()
+    slug = models.SlugField(max_length=100)
+    change_seq = models.BigIntegerField()
+    deleted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'change_seq'),
+                name='notes_tombstone_author_seq_idx',
+            ),
+        )
+
+
+class AuthorStats(models.Model):
+    """Сводка по заметкам автора, обновляется вместе с заметками."""
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='note_stats',
+    )
+    note_count = models.PositiveIntegerField('Заметок', default=0)
+    text_bytes = models.PositiveBigIntegerField('Байт текста', default=0)
+    last_modified = models.DateTimeField(
+        'Последнее изменение', null=True, blank=True
+    )
+
+
+class NoteRevision(models.Model):
+    """Версия текста заметки: снимок или разница с предыдущей версией."""
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+    )
+    number = models.PositiveIntegerField('Номер версии')
+    # Номер снимка, с которого восстанавливается эта версия; у самого
+    # снимка совпадает с number.
+    base = models.PositiveIntegerField('Номер снимка')
+    data = models.BinaryField('Сжатые данные')
+    text_bytes = models.PositiveIntegerField('Байт текста')
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'number'),
+                name='notes_revision_note_number_uniq',
+            ),
+        )
+
+    @property
+    def is_snapshot(self):
+        return self.base == self.number
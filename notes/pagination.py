@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.http import Http404
+from django.utils.functional import cached_property
+
+CURSOR_PARAM = 'after'
+
+
+def get_cursor(request):
+    """Возвращает id, после которого начинается страница, или None."""
+    after = request.GET.get(CURSOR_PARAM)
+    if not after:
+        return None
+    try:
+        cursor = int(after)
+    except ValueError:
+        raise Http404('Некорректный курсор страницы.')
+    if cursor < 0:
+        raise Http404('Некорректный курсор страницы.')
+    return cursor
+
+
+def keyset_page(queryset, cursor, page_size):
+    """Страница заметок по курсору: id > cursor, без OFFSET.
+
+    Возвращает список заметок страницы и курсор следующей страницы (None,
+    если страница последняя). Выбирается на строку больше страницы: по ней
+    видно, есть ли следующая, без отдельного запроса.
+    """
+    queryset = queryset.order_by('id')
+    if cursor is not None:
+        queryset = queryset.filter(id__gt=cursor)
+    rows = list(queryset[:page_size + 1])
+    if len(rows) > page_size:
+        return rows[:page_size], rows[page_size - 1].id
+    return rows, None
+
+
+def estimated_count(queryset):
+    """Примерное число строк таблицы по статистике СУБД, без COUNT(*).
+
+    Возвращает None, если оценки нет.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    elif connection.vendor == 'mysql':
+        sql = (
+            'SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s'
+        )
+    else:
+        # В SQLite статистики может не быть; MAX первичного ключа берётся
+        # из индекса и не меньше числа строк.
+        return queryset.model._base_manager.using(queryset.db).aggregate(
+            last=Max('pk')
+        )['last'] or 0
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Для всей таблицы число строк берёт из оценки СУБД.
+
+    Выборки с фильтром и небольшие таблицы считаются точно.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset)
+            if (
+                estimate is not None
+                and estimate >= settings.NOTES_EXACT_COUNT_LIMIT
+            ):
+                return estimate
+        return super().count
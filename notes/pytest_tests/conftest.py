@@ -1,17 +1,85 @@
 import pytest
 
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.test.client import Client
 from notes.models import Note
 
+USERNAMES = ('Author', 'Not the author')
+
+# Сколько запросов к базе может сделать GET страницы маршрута:
+# лимит не зависит от числа заметок автора. Сессия и пользователь
+# берутся из кеша и в лимит не входят.
+QUERY_BUDGETS = {
+    'notes:home': 1,
+    'notes:add': 2,
+    'notes:edit': 4,
+    'notes:detail': 1,
+    'notes:body': 2,
+    'notes:history': 3,
+    'notes:revision': 3,
+    'notes:delete': 1,
+    'notes:list': 5,
+    'notes:search': 2,
+    'notes:export': 1,
+    'notes:folders': 1,
+    'notes:folder_edit': 1,
+    'notes:folder_delete': 1,
+    'notes:tags': 1,
+    'notes:tag_edit': 1,
+    'notes:tag_delete': 1,
+    'notes:api_list': 2,
+    'notes:api_detail': 2,
+    'notes:api_stats': 1,
+    'notes:sync': 2,
+    'notes:metrics': 0,
+    'notes:success': 0,
+    'users:login': 0,
+    'users:logout': 2,
+    'users:signup': 0,
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Откат транзакции теста не сбрасывает закешированные страницы.
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def metrics_allowed(settings):
+    """Метрики открыты адресу тестового клиента."""
+    settings.NOTES_METRICS_ALLOWED_IPS = ['127.0.0.1']
+
+
+@pytest.fixture
+def query_budget(django_assert_max_num_queries):
+    """Проверка, что код внутри блока уложился в бюджет маршрута."""
+    def budget(name):
+        return django_assert_max_num_queries(QUERY_BUDGETS[name], info=name)
+    return budget
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    # Пользователи создаются один раз на сессию, как в setUpTestData:
+    # изменения внутри теста откатываются вместе с его транзакцией.
+    with django_db_blocker.unblock():
+        User = get_user_model()
+        User.objects.bulk_create(
+            User(username=username) for username in USERNAMES
+        )
+
 
 @pytest.fixture
 def author(django_user_model):
-    return django_user_model.objects.create(username='Author')
+    return django_user_model.objects.get(username=USERNAMES[0])
 
 
 @pytest.fixture
 def not_author(django_user_model):
-    return django_user_model.objects.create(username='Not the author')
+    return django_user_model.objects.get(username=USERNAMES[1])
 
 
 @pytest.fixture
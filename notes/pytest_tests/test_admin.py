@@ -0,0 +1,91 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from notes.pagination import EstimatedCountPaginator
+
+pytestmark = pytest.mark.django_db
+
+CHANGELIST_URL = reverse('admin:notes_note_changelist')
+
+
+@pytest.fixture
+def many_notes(author, not_author):
+    for index in range(30):
+        Note.objects.create(
+            title=f'Заметка {index}',
+            text='Обычный текст',
+            author=author if index % 2 else not_author,
+        )
+    return Note.objects.all()
+
+
+def changelist_queries(admin_client, data=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(CHANGELIST_URL, data)
+    assert response.status_code == 200
+    return response, [query['sql'] for query in queries]
+
+
+def test_changelist_queries_do_not_grow(admin_client, note, many_notes):
+    _, few = changelist_queries(admin_client, {'q': note.slug})
+    _, all_rows = changelist_queries(admin_client)
+    # Автор и папка приходят в одном запросе со строками.
+    assert len(all_rows) == len(few)
+
+
+def test_changelist_skips_text(admin_client, many_notes):
+    _, queries = changelist_queries(admin_client)
+    rows = next(sql for sql in queries if 'ORDER BY' in sql)
+    assert '"notes_note"."text"' not in rows
+    assert 'ORDER BY "notes_note"."id" DESC' in rows
+
+
+def test_changelist_uses_estimated_count(settings, admin_client, many_notes):
+    settings.NOTES_EXACT_COUNT_LIMIT = 0
+    response, queries = changelist_queries(admin_client)
+    assert not any('COUNT(' in sql for sql in queries)
+    assert response.context['cl'].result_count == many_notes.last().pk
+
+
+def test_filtered_count_is_exact(settings, many_notes):
+    settings.NOTES_EXACT_COUNT_LIMIT = 0
+    paginator = EstimatedCountPaginator(
+        many_notes.filter(title__endswith='1').order_by('id'), 10
+    )
+    assert paginator.count == 3
+
+
+def test_search_through_index(admin_client, note, many_notes):
+    note.text = 'Редкое слово'
+    note.save()
+    response, _ = changelist_queries(admin_client, {'q': 'редкое'})
+    assert list(response.context['cl'].result_list) == [note]
+
+
+def test_search_by_slug(admin_client, note, many_notes):
+    response, _ = changelist_queries(admin_client, {'q': note.slug})
+    assert list(response.context['cl'].result_list) == [note]
+
+
+def test_change_form_has_no_user_dropdown(admin_client, note, not_author):
+    url = reverse('admin:notes_note_change', args=(note.pk,))
+    content = admin_client.get(url).content.decode()
+    assert 'vForeignKeyRawIdAdminField' in content
+    assert f'>{not_author.username}</option>' not in content
+
+
+def test_change_form_saves_text(admin_client, note):
+    url = reverse('admin:notes_note_change', args=(note.pk,))
+    response = admin_client.post(url, {
+        'title': note.title,
+        'slug': note.slug,
+        'author': note.author_id,
+        'text': 'Текст из админки',
+    })
+    assert response.status_code == 302
+    note.refresh_from_db()
+    assert note.text == 'Текст из админки'
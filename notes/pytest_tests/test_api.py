@@ -0,0 +1,120 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from django.urls import reverse
+from django.utils.http import http_date
+
+from notes.models import Note
+
+LIST_URL = reverse('notes:api_list')
+
+
+@pytest.fixture
+def detail_url(note):
+    return reverse('notes:api_detail', args=(note.slug,))
+
+
+def send_json(client, method, url, data):
+    return getattr(client, method)(
+        url, json.dumps(data), content_type='application/json'
+    )
+
+
+def test_api_requires_login(client):
+    assert client.get(LIST_URL).status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_api_list(author_client, note):
+    data = author_client.get(LIST_URL).json()
+    assert [item['slug'] for item in data['results']] == [note.slug]
+    # Текст в списке не передаётся:
+    assert 'text' not in data['results'][0]
+    assert data['next_cursor'] is None
+
+
+def test_api_detail(author_client, note, detail_url):
+    data = author_client.get(detail_url).json()
+    assert data['text'] == note.text
+    assert data['updated'] == note.updated.isoformat()
+
+
+def test_api_detail_of_other_user(not_author_client, detail_url):
+    response = not_author_client.get(detail_url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_api_create(author_client, author, form_data):
+    response = send_json(author_client, 'post', LIST_URL, form_data)
+    assert response.status_code == HTTPStatus.CREATED
+    note = Note.objects.get()
+    assert note.author == author
+    assert response['Location'] == reverse('notes:api_detail',
+                                           args=(form_data['slug'],))
+
+
+def test_api_create_invalid(author_client, note, form_data):
+    form_data['slug'] = note.slug
+    response = send_json(author_client, 'post', LIST_URL, form_data)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert 'slug' in response.json()['errors']
+    response = author_client.post(LIST_URL, 'not json',
+                                  content_type='application/json')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_api_update(author_client, note, detail_url):
+    response = send_json(author_client, 'patch', detail_url,
+                         {'text': 'Новый текст'})
+    assert response.status_code == HTTPStatus.OK
+    note.refresh_from_db()
+    assert note.text == 'Новый текст'
+    assert note.title == 'Заголовок'
+
+
+def test_api_delete(author_client, detail_url):
+    response = author_client.delete(detail_url)
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert Note.objects.count() == 0
+
+
+@pytest.mark.parametrize('url', (LIST_URL, pytest.lazy_fixture('detail_url')))
+def test_api_etag(author_client, note, url):
+    response = author_client.get(url)
+    etag = response['ETag']
+    # Клиент с актуальной версией получает 304 без тела:
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b''
+    note.text = 'Изменённый текст'
+    note.save()
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_api_list_etag_follows_deletes(author_client, author, note):
+    Note.objects.create(title='Вторая', text='Текст', author=author)
+    etag = author_client.get(LIST_URL)['ETag']
+    note.delete()
+    response = author_client.get(LIST_URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_api_list_state_skips_notes_table(
+        author_client, note, django_assert_num_queries
+):
+    # Состояние списка для 304 - одна строка счётчика и сводки автора.
+    etag = author_client.get(LIST_URL)['ETag']
+    with django_assert_num_queries(1) as queries:
+        author_client.get(LIST_URL, HTTP_IF_NONE_MATCH=etag)
+    assert 'notes_note' not in queries.captured_queries[0]['sql']
+
+
+def test_api_if_modified_since(author_client, note, detail_url):
+    response = author_client.get(
+        detail_url,
+        HTTP_IF_MODIFIED_SINCE=http_date(note.updated.timestamp() + 1),
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
@@ -0,0 +1,148 @@
+import asyncio
+import tempfile
+import threading
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import reverse
+
+from notes import api, views
+from notes.async_views import async_view, get_executor, run_in_pool
+from notes.models import Note
+
+
+@pytest.fixture
+def inline_pool(settings):
+    # Потоки пула не видят данных из транзакции теста: в тестах базы
+    # выполняем код в общем потоке sync_to_async.
+    settings.NOTES_ASYNC_THREADS = 0
+
+
+@pytest.fixture
+def asgi_get(inline_pool):
+    """GET через настоящий ASGIHandler, с cookie клиента."""
+    # Как и тестовый клиент, не закрываем соединение с транзакцией теста.
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+
+    def asgi_get(client, path):
+        cookie = '; '.join(
+            f'{name}={morsel.value}' for name, morsel in client.cookies.items()
+        )
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'root_path': '',
+            'query_string': b'',
+            'headers': [
+                (b'host', b'testserver'), (b'cookie', cookie.encode())
+            ],
+            'server': ('testserver', 80),
+            'client': ('127.0.0.1', 50000),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(ASGIHandler())(scope, receive, send)
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        return messages[0]['status'], body
+
+    yield asgi_get
+    request_started.connect(close_old_connections)
+    request_finished.connect(close_old_connections)
+
+
+def get(view, user, url, **kwargs):
+    request = RequestFactory().get(url)
+    request.user = user
+    return async_to_sync(async_view(view))(request, **kwargs)
+
+
+def test_async_views_are_coroutines():
+    view = async_view(views.NotesList.as_view())
+    assert asyncio.iscoroutinefunction(view)
+
+
+def test_async_list(inline_pool, author, note):
+    response = get(views.NotesList.as_view(), author, reverse('notes:list'))
+    assert response.status_code == 200
+    assert note.title in response.content.decode()
+
+
+def test_async_detail(inline_pool, author, not_author, note):
+    url = reverse('notes:detail', args=(note.slug,))
+    response = get(views.NoteDetail.as_view(), author, url, slug=note.slug)
+    assert note.text in response.content.decode()
+    with pytest.raises(Http404):
+        get(views.NoteDetail.as_view(), not_author, url, slug=note.slug)
+
+
+def test_async_api_list(inline_pool, author, note):
+    response = get(api.ApiNoteList.as_view(), author,
+                   reverse('notes:api_list'))
+    assert b'"slug": "note-slug"' in response.content
+
+
+@pytest.mark.parametrize('name', ('notes:list', 'notes:body', 'notes:export'))
+def test_asgi_handler_serves_read_paths(asgi_get, author_client, note, name):
+    # Потоковые ответы Django 3.2 перебирает в цикле событий: тело
+    # заметки и выгрузку запросы к базе не должны читать оттуда.
+    args = (note.slug,) if name == 'notes:body' else ()
+    status, body = asgi_get(author_client, reverse(name, args=args))
+    assert status == 200
+    assert note.title.encode() in body
+
+
+def test_asgi_export_spooled_to_disk(
+        asgi_get, author_client, author, settings, monkeypatch
+):
+    # Выгрузка больше NOTES_STREAM_SPOOL_SIZE не собирается в памяти.
+    settings.NOTES_STREAM_SPOOL_SIZE = 1024
+    spools = []
+
+    class RecordedSpool(tempfile.SpooledTemporaryFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            spools.append(self)
+
+    monkeypatch.setattr(
+        'notes.async_views.tempfile',
+        SimpleNamespace(SpooledTemporaryFile=RecordedSpool),
+    )
+    text = 'Длинный текст. ' * 2000
+    Note.objects.create(title='Длинная', text=text, author=author)
+    status, body = asgi_get(author_client, reverse('notes:export'))
+    assert status == 200
+    assert text.encode() in body
+    [spool] = spools
+    assert spool._rolled
+    assert spool.closed
+
+
+def test_pool_is_bounded(settings):
+    settings.NOTES_ASYNC_THREADS = 2
+    get_executor.cache_clear()
+    try:
+        thread_name = async_to_sync(run_in_pool)(
+            lambda: threading.current_thread().name
+        )
+        assert thread_name.startswith('notes-async')
+        assert get_executor()._max_workers == 2
+    finally:
+        get_executor.cache_clear()
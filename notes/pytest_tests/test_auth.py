@@ -0,0 +1,102 @@
+import pytest
+
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.auth import (
+    CACHED_BACKEND, USER_KEY, CachedModelBackend, get_user_cache,
+)
+
+pytestmark = pytest.mark.django_db
+
+LIST_URL = reverse('notes:list')
+
+
+def cached_user(user):
+    return CachedModelBackend().get_user(user.pk) if get_user_cache().get(
+        USER_KEY.format(user_id=user.pk)
+    ) else None
+
+
+def test_login_caches_user(author_client, author, django_assert_num_queries):
+    assert cached_user(author) == author
+    # Сессия и пользователь из кеша: остаётся только страница заметок.
+    with django_assert_num_queries(1):
+        author_client.get(reverse('notes:home'))
+
+
+def test_user_read_from_db_after_cache_miss(
+        author_client, author, django_assert_num_queries
+):
+    get_user_cache().clear()
+    # Сессия из таблицы, пользователь, сводка автора.
+    with django_assert_num_queries(3):
+        author_client.get(reverse('notes:home'))
+    assert cached_user(author) == author
+
+
+def test_logout_forgets_user(author_client, author):
+    author_client.get(reverse('users:logout'))
+    assert cached_user(author) is None
+
+
+def test_password_change_logs_out(author_client, author):
+    author.set_password('new-password-123')
+    author.save()
+    response = author_client.get(LIST_URL)
+    assert response.url.startswith(reverse('users:login'))
+
+
+def test_deactivated_user_logged_out(author_client, author):
+    author.is_active = False
+    author.save(update_fields=('is_active',))
+    response = author_client.get(LIST_URL)
+    assert response.url.startswith(reverse('users:login'))
+
+
+def test_password_hash_not_cached(author):
+    author.set_password('password-123')
+    author.save()
+    Client().force_login(author)
+    cached = get_user_cache().get(USER_KEY.format(user_id=author.pk))
+    assert 'password' not in cached['fields']
+    assert author.password not in str(cached)
+    user = CachedModelBackend().get_user(author.pk)
+    assert user.get_session_auth_hash() == author.get_session_auth_hash()
+    assert user.get_deferred_fields() == {'password'}
+
+
+def test_saving_cached_user_keeps_password(author):
+    author.set_password('password-123')
+    author.save()
+    Client().force_login(author)
+    user = CachedModelBackend().get_user(author.pk)
+    user.first_name = 'Автор'
+    user.save()
+    author.refresh_from_db()
+    assert author.first_name == 'Автор'
+    assert author.check_password('password-123')
+
+
+@pytest.mark.parametrize('engine', ('cache', 'signed_cookies'))
+def test_session_engines(
+        settings, author, engine, django_assert_num_queries
+):
+    settings.SESSION_ENGINE = f'django.contrib.sessions.backends.{engine}'
+    client = Client()
+    client.force_login(author)
+    with django_assert_num_queries(1):
+        response = client.get(reverse('notes:home'))
+    assert response.context['user'] == author
+
+
+def test_session_from_model_backend_stays_logged_in(author, settings):
+    client = Client()
+    client.force_login(
+        author, backend='django.contrib.auth.backends.ModelBackend'
+    )
+    response = client.get(LIST_URL)
+    assert response.status_code == 200
+    assert client.session[BACKEND_SESSION_KEY] == CACHED_BACKEND
+    assert settings.AUTHENTICATION_BACKENDS == [CACHED_BACKEND]
@@ -0,0 +1,125 @@
+import pytest
+
+from django.urls import reverse
+
+from notes.bulk import bulk_delete, bulk_move, bulk_tag
+from notes.models import Folder, Note, NoteTombstone, Tag
+from notes.search import search_notes
+from notes.stats import get_stats
+
+pytestmark = pytest.mark.django_db
+
+BULK_URL = reverse('notes:bulk')
+
+
+@pytest.fixture
+def folder(author):
+    return Folder.objects.create(author=author, name='Работа')
+
+
+@pytest.fixture
+def notes(author, folder):
+    return [
+        Note.objects.create(
+            title=f'Заметка {index}', text='Текст', author=author,
+            folder=folder,
+        )
+        for index in range(3)
+    ]
+
+
+def ids_of(notes):
+    return [note.pk for note in notes]
+
+
+def test_bulk_delete_keeps_aggregates(author, folder, notes):
+    kept = notes.pop()
+    assert bulk_delete(author, ids_of(notes), chunk_size=1) == 2
+    assert list(Note.objects.filter(author=author)) == [kept]
+    # Счётчики и сводка совпадают с поштучным удалением:
+    folder.refresh_from_db()
+    assert folder.note_count == 1
+    assert get_stats(author).note_count == 1
+    assert get_stats(author).text_bytes == len(kept.text.encode())
+    tombstones = NoteTombstone.objects.filter(author=author)
+    assert sorted(tombstones.values_list('note_id', flat=True)) == sorted(
+        ids_of(notes)
+    )
+    assert len(set(tombstones.values_list('change_seq', flat=True))) == 2
+    assert search_notes(author, 'Заметка', 10) == [kept]
+
+
+def test_bulk_delete_one_delete_per_chunk(
+        author, notes, django_assert_num_queries
+):
+    # Чтение пачки, DELETE связей, индекса, версий и самих заметок, затем
+    # надгробия, счётчики и сводка: число запросов не растёт с пачкой.
+    with django_assert_num_queries(16):
+        bulk_delete(author, ids_of(notes), chunk_size=len(notes))
+
+
+def test_bulk_ignores_foreign_notes(author, not_author, notes):
+    foreign = Note.objects.create(
+        title='Чужая', text='Текст', author=not_author
+    )
+    assert bulk_delete(author, [foreign.pk, 10 ** 9], chunk_size=10) == 0
+    assert Note.objects.filter(pk=foreign.pk).exists()
+
+
+def test_bulk_move_updates_counts(author, folder, notes):
+    other = Folder.objects.create(author=author, name='Дом')
+    assert bulk_move(author, ids_of(notes[:2]), other, chunk_size=1) == 2
+    folder.refresh_from_db()
+    other.refresh_from_db()
+    assert (folder.note_count, other.note_count) == (1, 2)
+    bulk_move(author, ids_of(notes), None, chunk_size=10)
+    assert Folder.objects.filter(note_count=0).count() == 2
+
+
+def test_bulk_tag_skips_existing_links(author, notes):
+    tag = Tag.objects.create(author=author, name='важное')
+    tag.notes.add(notes[0])
+    assert bulk_tag(author, ids_of(notes), tag, chunk_size=2) == 3
+    assert tag.notes.count() == 3
+
+
+def test_bulk_view_deletes_selected(author_client, author, notes):
+    response = author_client.post(
+        BULK_URL, {'action': 'delete', 'notes': ids_of(notes[:2])}
+    )
+    assert response.url == reverse('notes:success')
+    assert list(Note.objects.filter(author=author)) == notes[2:]
+
+
+def test_bulk_view_rejects_foreign_folder(
+        author_client, not_author, notes
+):
+    folder = Folder.objects.create(author=not_author, name='Чужая')
+    response = author_client.post(BULK_URL, {
+        'action': 'move', 'notes': ids_of(notes), 'folder': folder.pk,
+    })
+    assert 'folder' in response.context['form'].errors
+
+
+@pytest.mark.parametrize('data, field', (
+    ({'action': 'tag', 'notes': [1]}, 'tag'),
+    ({'action': 'delete', 'notes': ['x']}, 'notes'),
+    ({'action': 'delete'}, 'notes'),
+))
+def test_bulk_view_validates_input(author_client, data, field):
+    response = author_client.post(BULK_URL, data)
+    assert field in response.context['form'].errors
+
+
+def test_bulk_view_is_post_only(author_client):
+    assert author_client.get(BULK_URL).status_code == 405
+
+
+def test_list_cache_follows_csrf_cookie(author_client, note):
+    author_client.get(reverse('notes:list'))
+    # Страница с токеном из новой cookie отдаётся из кеша только запросам
+    # с этой cookie.
+    assert author_client.get(reverse('notes:list')).context is None
+    author_client.cookies.clear()
+    author_client.force_login(note.author)
+    assert author_client.get(reverse('notes:list')).context is not None
@@ -0,0 +1,117 @@
+from django.urls import reverse
+
+from notes import metrics
+from notes.cache import VERSION_KEY
+from notes.cache_backends import FileCache
+from notes.checks import check_shared_caches
+
+LIST_URL = reverse('notes:list')
+
+
+def test_list_served_from_cache(author_client, note):
+    metrics.reset()
+    first = author_client.get(LIST_URL)
+    second = author_client.get(LIST_URL)
+    # Из кеша отдаётся готовый HTML, шаблон не рендерится:
+    assert first.context is not None
+    assert second.context is None
+    assert second.content == first.content
+    assert metrics.get_counter('notes_page_cache_misses_total',
+                               view='list') == 1
+    assert metrics.get_counter('notes_page_cache_hits_total',
+                               view='list') == 1
+
+
+def test_detail_cache_invalidated_on_edit(
+        author_client, note, django_capture_on_commit_callbacks
+):
+    url = reverse('notes:detail', args=(note.slug,))
+    author_client.get(url)
+    note.title = 'Новый заголовок'
+    with django_capture_on_commit_callbacks(execute=True):
+        note.save()
+    response = author_client.get(url)
+    assert response.context is not None
+    assert 'Новый заголовок' in response.content.decode()
+
+
+def test_version_bumped_after_commit(
+        author_client, note, django_capture_on_commit_callbacks
+):
+    url = reverse('notes:detail', args=(note.slug,))
+    note.title = 'Новый заголовок'
+    with django_capture_on_commit_callbacks(execute=True):
+        note.save()
+        # До коммита страница рендерится по старым данным: она не должна
+        # попасть в кеш под версией, которая уже учитывает запись.
+        author_client.get(url)
+    response = author_client.get(url)
+    assert response.context is not None
+
+
+def test_write_invalidates_only_authors_pages(
+        author_client, not_author_client, note, not_author,
+        django_capture_on_commit_callbacks
+):
+    author_client.get(LIST_URL)
+    not_author_client.get(LIST_URL)
+    with django_capture_on_commit_callbacks(execute=True):
+        note.delete()
+    assert author_client.get(LIST_URL).context is not None
+    assert not_author_client.get(LIST_URL).context is None
+
+
+def test_metrics_endpoint(metrics_allowed, client, author_client, note):
+    metrics.reset()
+    author_client.get(LIST_URL)
+    response = client.get(reverse('notes:metrics'))
+    assert (
+        'notes_page_cache_misses_total{view="list"} 1'
+        in response.content.decode()
+    )
+
+
+def test_local_page_cache_rejected_for_many_workers(settings, tmp_path):
+    settings.NOTES_SINGLE_WORKER = False
+    errors = check_shared_caches(None)
+    assert {error.id for error in errors} == {'notes.E001'}
+    assert [error.msg.partition(' ')[0] for error in errors] == [
+        'NOTES_CACHE_ALIAS', 'NOTES_VERSION_CACHE_ALIAS',
+        'NOTES_USER_CACHE_ALIAS', 'SESSION_CACHE_ALIAS',
+    ]
+    settings.CACHES = {
+        alias: {
+            'BACKEND': 'notes.cache_backends.FileCache',
+            'LOCATION': str(tmp_path / alias),
+        }
+        for alias in ('default', 'state')
+    }
+    assert check_shared_caches(None) == []
+
+
+def file_cache(tmp_path, **options):
+    return FileCache(str(tmp_path), {'OPTIONS': {'MAX_ENTRIES': 3, **options}})
+
+
+def test_state_cache_never_culled(tmp_path):
+    state = file_cache(tmp_path, CULL_EVERY=None)
+    for author_id in range(10):
+        state.set(VERSION_KEY.format(author_id=author_id), author_id, None)
+    assert all(
+        state.get(VERSION_KEY.format(author_id=author_id)) == author_id
+        for author_id in range(10)
+    )
+
+
+def test_page_cache_lists_files_every_n_writes(tmp_path, monkeypatch):
+    pages = file_cache(tmp_path, CULL_EVERY=5, CULL_FREQUENCY=2)
+    listings = []
+    list_files = pages._list_cache_files
+    monkeypatch.setattr(
+        pages, '_list_cache_files',
+        lambda: listings.append(1) or list_files(),
+    )
+    for index in range(10):
+        pages.set(f'page-{index}', index)
+    assert len(listings) == 2
+    assert len(list_files()) < 10
@@ -0,0 +1,154 @@
+import gzip
+
+import pytest
+
+from django.core.cache import caches
+from django.urls import reverse
+
+from notes.cache import VERSION_KEY, get_version
+from notes.models import Folder, Note
+from notes.storage import brotli
+
+pytestmark = pytest.mark.django_db
+
+LIST_URL = reverse('notes:list')
+
+
+@pytest.fixture
+def long_note(author):
+    return Note.objects.create(
+        title='Длинная', text='Строка текста. ' * 500, author=author
+    )
+
+
+def test_list_is_gzipped(author_client, long_note):
+    response = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response['Vary']
+    assert int(response['Content-Length']) == len(response.content)
+    assert long_note.title in gzip.decompress(response.content).decode()
+
+
+@pytest.mark.skipif(brotli is None, reason='пакет brotli не установлен')
+def test_brotli_preferred(author_client, long_note):
+    response = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert response['Content-Encoding'] == 'br'
+    assert long_note.title in brotli.decompress(response.content).decode()
+
+
+def test_small_responses_not_compressed(settings, author_client, note):
+    settings.NOTES_COMPRESS_MIN_SIZE = 10 ** 6
+    response = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING='gzip')
+    assert not response.has_header('Content-Encoding')
+
+
+def test_streamed_body_is_gzipped(author_client, long_note):
+    url = reverse('notes:body', args=(long_note.slug,))
+    response = author_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    body = gzip.decompress(b''.join(response.streaming_content)).decode()
+    assert body.endswith('</html>\n')
+
+
+def test_zip_export_not_recompressed(author_client, long_note):
+    response = author_client.get(
+        reverse('notes:export'), {'format': 'zip'}, HTTP_ACCEPT_ENCODING='gzip'
+    )
+    assert not response.has_header('Content-Encoding')
+
+
+def revalidate(client, url, response, **headers):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+
+
+@pytest.mark.parametrize('encoding', ('', 'gzip'))
+def test_unchanged_page_not_modified(
+        author_client, long_note, encoding, django_assert_num_queries
+):
+    url = reverse('notes:detail', args=(long_note.slug,))
+    response = author_client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+    # ETag сверяется до шаблона, кеша страниц и запросов к базе.
+    with django_assert_num_queries(0):
+        response = revalidate(
+            author_client, url, response, HTTP_ACCEPT_ENCODING=encoding
+        )
+    assert response.status_code == 304
+    assert response.content == b''
+
+
+def test_note_edit_changes_etag(
+        author_client, note, django_capture_on_commit_callbacks
+):
+    url = reverse('notes:detail', args=(note.slug,))
+    response = author_client.get(url)
+    note.text = 'Новый текст'
+    with django_capture_on_commit_callbacks(execute=True):
+        note.save()
+    response = revalidate(author_client, url, response)
+    assert response.status_code == 200
+    assert 'Новый текст' in response.content.decode()
+
+
+def test_folder_rename_changes_list_etag(
+        author_client, author, note, django_capture_on_commit_callbacks
+):
+    folder = Folder.objects.create(author=author, name='Старая')
+    response = author_client.get(LIST_URL)
+    folder.name = 'Новая'
+    with django_capture_on_commit_callbacks(execute=True):
+        folder.save()
+    assert revalidate(author_client, LIST_URL, response).status_code == 200
+
+
+def test_etag_issued_before_commit_not_reused(
+        author_client, note, django_capture_on_commit_callbacks
+):
+    # Страница, отданная между записью и её фиксацией, показывает старый
+    # текст: её ETag не должен подойти и после фиксации.
+    url = reverse('notes:detail', args=(note.slug,))
+    note.text = 'Новый текст'
+    with django_capture_on_commit_callbacks(execute=True):
+        note.save()
+        response = author_client.get(url)
+    response = revalidate(author_client, url, response)
+    assert response.status_code == 200
+    assert 'Новый текст' in response.content.decode()
+
+
+def test_etag_changes_in_other_workers(
+        settings, tmp_path, author_client, note,
+        django_capture_on_commit_callbacks
+):
+    settings.CACHES = {**settings.CACHES, 'versions': {
+        'BACKEND': 'notes.cache_backends.FileCache',
+        'LOCATION': str(tmp_path),
+    }}
+    settings.NOTES_VERSION_CACHE_ALIAS = 'versions'
+    url = reverse('notes:detail', args=(note.slug,))
+    response = author_client.get(url)
+    # Кеш другого процесса: свой объект поверх тех же файлов.
+    other_worker = caches.create_connection('versions')
+    note.text = 'Новый текст'
+    with django_capture_on_commit_callbacks(execute=True):
+        note.save()
+    version = other_worker.get(VERSION_KEY.format(author_id=note.author_id))
+    assert version == get_version(note.author_id)
+    assert revalidate(author_client, url, response).status_code == 200
+
+
+def test_etag_is_per_user(author_client, not_author_client, note):
+    response = author_client.get(LIST_URL)
+    other = revalidate(not_author_client, LIST_URL, response)
+    assert other.status_code == 200
+
+
+def test_no_etag_without_page_cache(settings, author_client, note):
+    settings.CACHES = {
+        **settings.CACHES,
+        'pages': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    }
+    settings.NOTES_CACHE_ALIAS = 'pages'
+    settings.NOTES_VERSION_CACHE_ALIAS = 'pages'
+    assert not author_client.get(LIST_URL).has_header('ETag')
@@ -1,8 +1,12 @@
+import re
+
 import pytest
+from http import HTTPStatus
 
 from django.urls import reverse
 
 from notes.forms import NoteForm
+from notes.models import Note
 
 
 @pytest.mark.parametrize(
@@ -46,3 +50,67 @@ def test_pages_contains_form(author_client, name, args):
     assert 'form' in response.context
     # Проверяем, что объект формы относится к нужному классу.
     assert isinstance(response.context['form'], NoteForm)
+
+
+def test_notes_list_paginated_by_cursor(author, author_client, settings):
+    settings.NOTES_PAGE_SIZE = 2
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст', slug=f'slug-{index}',
+             author=author)
+        for index in range(3)
+    )
+    url = reverse('notes:list')
+    response = author_client.get(url)
+    first_page = response.context['object_list']
+    # Страница - готовый список без лишней строки-признака следующей.
+    assert isinstance(first_page, list)
+    assert len(first_page) == 2
+    # Курсор следующей страницы - id последней заметки на странице:
+    next_cursor = response.context['next_cursor']
+    assert next_cursor == first_page[-1].id
+    response = author_client.get(url, {'after': next_cursor})
+    second_page = list(response.context['object_list'])
+    assert len(second_page) == 1
+    assert second_page[0].id > next_cursor
+    assert response.context['next_cursor'] is None
+
+
+def test_notes_list_does_not_load_text(note, author_client):
+    response = author_client.get(reverse('notes:list'))
+    listed_note = response.context['object_list'][0]
+    assert 'text' in listed_note.get_deferred_fields()
+
+
+@pytest.mark.parametrize('name', ('notes:detail', 'notes:delete'))
+def test_note_pages_do_not_load_text(note, author_client, name):
+    # Вместо текста страницы получают только его начало.
+    response = author_client.get(reverse(name, args=(note.slug,)))
+    shown_note = response.context['note']
+    assert {'text', 'text_html'} <= shown_note.get_deferred_fields()
+    assert shown_note.preview == note.text
+
+
+def test_edit_page_does_not_load_html(note, author_client):
+    response = author_client.get(reverse('notes:edit', args=(note.slug,)))
+    assert 'text_html' in response.context['note'].get_deferred_fields()
+
+
+def test_delete_does_not_select_text(
+    note, author_client, django_assert_max_num_queries
+):
+    with django_assert_max_num_queries(20) as queries:
+        author_client.post(reverse('notes:delete', args=(note.slug,)))
+    # Текст может попасть в запрос только внутри SUBSTR для превью
+    # и LENGTH для размера в байтах.
+    selected = [
+        re.sub(r'(SUBSTR|LENGTH)\([^)]*\)', '', query['sql'])
+        for query in queries.captured_queries
+        if query['sql'].startswith('SELECT')
+    ]
+    assert not any('"notes_note"."text"' in sql for sql in selected)
+    assert not Note.objects.filter(pk=note.pk).exists()
+
+
+def test_notes_list_bad_cursor(author_client):
+    response = author_client.get(reverse('notes:list'), {'after': 'abc'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,19 @@
+import pytest
+
+from django.db import connection
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'pragma, expected',
+    (
+        ('synchronous', 1),
+        ('busy_timeout', 5000),
+        ('cache_size', -64 * 1024),
+        ('temp_store', 2),
+    )
+)
+def test_sqlite_connection_pragmas(pragma, expected):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {pragma}')
+        assert cursor.fetchone()[0] == expected
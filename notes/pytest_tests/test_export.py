@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import zipfile
+
+import pytest
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes.models import Note
+
+EXPORT_URL = reverse('notes:export')
+
+
+@pytest.fixture
+def notes(author, note):
+    another = Note.objects.create(
+        title='Вторая', text='Строка 1\nСтрока 2', slug='second',
+        author=author,
+    )
+    return note, another
+
+
+def export(client, export_format):
+    response = client.get(EXPORT_URL, {'format': export_format})
+    assert response.streaming
+    return b''.join(response.streaming_content)
+
+
+def test_export_jsonl(author_client, notes):
+    lines = export(author_client, 'jsonl').decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'title': note.title, 'slug': note.slug, 'text': note.text}
+        for note in notes
+    ]
+
+
+def test_export_csv(author_client, notes):
+    rows = list(csv.reader(io.StringIO(export(author_client, 'csv').decode())))
+    assert rows[0] == ['title', 'slug', 'text']
+    assert rows[1:] == [[note.title, note.slug, note.text] for note in notes]
+
+
+def test_export_markdown_zip(author_client, notes):
+    archive = zipfile.ZipFile(io.BytesIO(export(author_client, 'zip')))
+    assert archive.namelist() == [f'{note.slug}.md' for note in notes]
+    assert archive.read('second.md').decode() == (
+        '# Вторая\n\nСтрока 1\nСтрока 2\n'
+    )
+
+
+def test_export_only_own_notes(not_author_client, notes):
+    assert export(not_author_client, 'jsonl') == b''
+
+
+def test_export_unknown_format(author_client):
+    response = author_client.get(EXPORT_URL, {'format': 'xml'})
+    assert response.status_code == 404
+
+
+def test_export_notes_command(author, notes, tmp_path):
+    output = tmp_path / 'notes.jsonl'
+    call_command('export_notes', author.username, '--output', str(output),
+                 '--chunk-size', '1')
+    slugs = [json.loads(line)['slug'] for line in output.open()]
+    assert slugs == [note.slug for note in notes]
@@ -0,0 +1,192 @@
+import pytest
+
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from notes.models import Folder, Note, Tag
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def folder(author):
+    return Folder.objects.create(author=author, name='Работа')
+
+
+@pytest.fixture
+def other_folder(author):
+    return Folder.objects.create(author=author, name='Дом')
+
+
+@pytest.fixture
+def tag(author):
+    return Tag.objects.create(author=author, name='важное')
+
+
+def note_count(folder):
+    folder.refresh_from_db()
+    return folder.note_count
+
+
+def test_folder_counts_follow_notes(author, folder, other_folder):
+    note = Note.objects.create(
+        title='Заметка', text='Текст', author=author, folder=folder
+    )
+    assert note_count(folder) == 1
+    note = Note.objects.get(pk=note.pk)
+    note.folder = other_folder
+    note.save()
+    assert (note_count(folder), note_count(other_folder)) == (0, 1)
+    # Повторное сохранение без переноса счётчики не меняет.
+    note.save()
+    assert note_count(other_folder) == 1
+    note.delete()
+    assert note_count(other_folder) == 0
+
+
+def test_update_fields_without_folder_keep_counts(note, folder):
+    Note.objects.filter(pk=note.pk).update(folder=folder)
+    note = Note.objects.get(pk=note.pk)
+    note.title = 'Новый заголовок'
+    note.save(update_fields=('title',))
+    assert note_count(folder) == 0
+
+
+def test_edit_form_moves_note(author_client, note, folder, tag):
+    response = author_client.post(
+        reverse('notes:edit', args=(note.slug,)),
+        {
+            'title': note.title,
+            'text': note.text,
+            'slug': note.slug,
+            'folder': folder.pk,
+            'tags': [tag.pk],
+        },
+    )
+    assert response.status_code == 302
+    note.refresh_from_db()
+    assert note.folder == folder
+    assert list(note.tags.all()) == [tag]
+    assert note_count(folder) == 1
+
+
+def test_form_rejects_foreign_folder(not_author_client, folder, form_data):
+    response = not_author_client.post(
+        reverse('notes:add'), dict(form_data, folder=folder.pk)
+    )
+    assert 'folder' in response.context['form'].errors
+    assert not Note.objects.exists()
+
+
+def test_list_filters(author_client, author, note, folder, tag):
+    tagged = Note.objects.create(
+        title='С меткой', text='Текст', author=author, folder=folder
+    )
+    tagged.tags.add(tag)
+    url = reverse('notes:list')
+    for params in ({'folder': folder.name}, {'tag': tag.name}):
+        response = author_client.get(url, params)
+        assert list(response.context['object_list']) == [tagged]
+        assert response.context['filters'] == params
+    response = author_client.get(url, {'tag': 'нет такой'})
+    assert not response.context['object_list']
+
+
+def test_list_tags_are_prefetched(
+    author_client, author, tag, django_assert_num_queries,
+    django_capture_on_commit_callbacks
+):
+    # Метки всей страницы грузятся одним запросом, а не по заметке.
+    url = reverse('notes:list')
+    author_client.get(url)
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст', slug=f'n-{index}',
+             author=author)
+        for index in range(10)
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        tag.notes.add(*Note.objects.filter(author=author))
+    with django_assert_num_queries(5):
+        response = author_client.get(url)
+    assert response.content.decode().count(f'#{tag.name}') == 10
+
+
+def test_next_page_keeps_filters(settings, author_client, author, tag):
+    settings.NOTES_PAGE_SIZE = 1
+    for index in range(2):
+        Note.objects.create(
+            title=f'Заметка {index}', text='Текст', author=author
+        ).tags.add(tag)
+    response = author_client.get(reverse('notes:list'), {'tag': tag.name})
+    query = urlencode({'tag': tag.name})
+    cursor = response.context['next_cursor']
+    assert f'?{query}&after={cursor}"' in response.content.decode()
+
+
+def test_api_put_keeps_tags(author_client, note, tag):
+    note.tags.add(tag)
+    response = author_client.put(
+        reverse('notes:api_detail', args=(note.slug,)),
+        {'title': 'Новый', 'text': 'Текст', 'slug': note.slug},
+        content_type='application/json',
+    )
+    assert response.status_code == 200
+    assert list(note.tags.all()) == [tag]
+
+
+@pytest.mark.parametrize('model, prefix', ((Folder, 'folder'), (Tag, 'tag')))
+def test_author_manages_labels(author_client, author, model, prefix):
+    list_url = reverse(f'notes:{prefix}s')
+    response = author_client.post(list_url, {'name': 'Работа'})
+    assert response.status_code == 302
+    label = model.objects.get(author=author)
+    assert label.name == 'Работа'
+    response = author_client.post(
+        reverse(f'notes:{prefix}_edit', args=(label.pk,)), {'name': 'Дом'}
+    )
+    assert response.status_code == 302
+    label.refresh_from_db()
+    assert label.name == 'Дом'
+    assert label.name in author_client.get(list_url).content.decode()
+    author_client.post(reverse(f'notes:{prefix}_delete', args=(label.pk,)))
+    assert not model.objects.exists()
+
+
+@pytest.mark.parametrize('prefix', ('folder', 'tag'))
+def test_duplicate_label_rejected(author_client, folder, tag, prefix):
+    name = folder.name if prefix == 'folder' else tag.name
+    response = author_client.post(reverse(f'notes:{prefix}s'), {'name': name})
+    assert 'name' in response.context['form'].errors
+
+
+def test_same_name_for_other_author(not_author_client, not_author, folder):
+    not_author_client.post(reverse('notes:folders'), {'name': folder.name})
+    assert Folder.objects.filter(author=not_author).exists()
+
+
+@pytest.mark.parametrize('prefix', ('folder', 'tag'))
+def test_foreign_labels_not_found(not_author_client, folder, tag, prefix):
+    label = folder if prefix == 'folder' else tag
+    for route in ('edit', 'delete'):
+        url = reverse(f'notes:{prefix}_{route}', args=(label.pk,))
+        assert not_author_client.get(url).status_code == 404
+        assert not_author_client.post(url, {'name': 'x'}).status_code == 404
+    assert not_author_client.get(reverse(f'notes:{prefix}s')).context[
+        'labels'
+    ].count() == 0
+    label.refresh_from_db()
+    assert label.name != 'x'
+
+
+def test_delete_folder_keeps_notes(author_client, note, folder):
+    Note.objects.filter(pk=note.pk).update(folder=folder)
+    author_client.post(reverse('notes:folder_delete', args=(folder.pk,)))
+    note.refresh_from_db()
+    assert note.folder is None
+
+
+@pytest.mark.parametrize('name', ('notes:folders', 'notes:tags'))
+def test_anonymous_redirected_to_login(client, name):
+    url = reverse(name)
+    response = client.get(url)
+    assert response.url == f'{reverse("users:login")}?next={url}'
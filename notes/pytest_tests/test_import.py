@@ -0,0 +1,81 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from pytils.translit import slugify
+
+from notes.models import Note
+from notes.search import get_backend
+from notes.stats import recompute_stats
+
+
+def write_jsonl(path, records):
+    path.write_text(
+        '\n'.join(json.dumps(record, ensure_ascii=False)
+                  for record in records),
+        encoding='utf-8',
+    )
+    return str(path)
+
+
+def test_import_resolves_slugs_like_save(author, note, tmp_path):
+    path = write_jsonl(tmp_path / 'notes.jsonl', [
+        {'title': 'Заметка', 'text': 'Один'},
+        {'title': 'Заметка', 'text': 'Два'},
+        {'title': 'Явный', 'text': 'Три', 'slug': 'explicit'},
+        # Явный slug уже занят - заметка пропускается, как в форме:
+        {'title': 'Занятый', 'text': 'Четыре', 'slug': note.slug},
+        # Без текста заметка не проходит проверку полей:
+        {'title': 'Пустая'},
+    ])
+    Note.objects.create(title='Заметка', text='Уже была', author=author)
+    call_command('import_notes', author.username, path, '--batch-size', '2',
+                 verbosity=0)
+    base = slugify('Заметка')
+    assert set(
+        Note.objects.filter(text__in=('Один', 'Два', 'Три'))
+        .values_list('slug', flat=True)
+    ) == {f'{base}-2', f'{base}-3', 'explicit'}
+    assert Note.objects.count() == 5
+
+
+def test_import_rejects_bad_rows(author, tmp_path):
+    path = tmp_path / 'notes.jsonl'
+    path.write_text('\n'.join((
+        json.dumps({'title': 'Первая', 'text': 'Один'}),
+        '{"title": "Обрыв',
+        '["не объект"]',
+        json.dumps({'title': 'Пробел', 'text': 'Два', 'slug': 'привет мир'}),
+        json.dumps({'title': 'Длинный', 'text': 'Три', 'slug': 'a' * 150}),
+        json.dumps({'title': 'Последняя', 'text': 'Четыре'}),
+    )), encoding='utf-8')
+    out = StringIO()
+    call_command('import_notes', author.username, str(path), '--batch-size',
+                 '2', verbosity=0, stdout=out)
+    assert set(Note.objects.values_list('text', flat=True)) == {
+        'Один', 'Четыре'
+    }
+    assert 'пропущено: 4' in out.getvalue()
+
+
+def test_import_csv_indexes_notes(author, tmp_path):
+    path = tmp_path / 'notes.csv'
+    path.write_text('title,text\nКот,Спит весь день\n', encoding='utf-8')
+    call_command('import_notes', author.username, str(path), verbosity=0)
+    note = Note.objects.get()
+    assert get_backend().search(author, 'кот', limit=10) == [note.id]
+
+
+def test_import_queries_per_batch(
+        author, tmp_path, django_assert_max_num_queries
+):
+    records = [{'title': f'Заметка {index}', 'text': 'Текст'}
+               for index in range(50)]
+    path = write_jsonl(tmp_path / 'notes.jsonl', records)
+    recompute_stats([author.pk])
+    # Пользователь, затем на пачку: slug, счётчик изменений с точками
+    # сохранения, вставка, pk, поисковый индекс, первые версии и сводка
+    # автора. Число запросов не зависит от числа заметок в пачке.
+    with django_assert_max_num_queries(16):
+        call_command('import_notes', author.username, path, verbosity=0)
+    assert Note.objects.count() == len(records)
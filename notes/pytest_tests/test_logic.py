@@ -6,8 +6,8 @@ from pytils.translit import slugify
 
 from django.urls import reverse
 
-from notes.forms import WARNING
-from notes.models import Note
+from notes.forms import WARNING, NoteForm
+from notes.models import ChangeCounter, Note
 
 
 def test_user_can_create_note(author_client, author, form_data):
@@ -110,3 +110,62 @@ def test_other_user_cant_delete_note(not_author_client, form_data, slug_for_args
     response = not_author_client.post(url)
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Note.objects.count() == 1
+
+
+def test_empty_slug_gets_suffix(author_client, form_data):
+    url = reverse('notes:add')
+    form_data.pop('slug')
+    for _ in range(3):
+        response = author_client.post(url, data=form_data)
+        assertRedirects(response, reverse('notes:success'))
+    expected_slug = slugify(form_data['title'])
+    # Одноимённые заметки получают суффиксы вместо ошибки формы:
+    assert set(Note.objects.values_list('slug', flat=True)) == {
+        expected_slug, f'{expected_slug}-2', f'{expected_slug}-3'
+    }
+
+
+def test_long_slug_suffix_fits_field(author):
+    title = 'б' * 100
+    first = Note.objects.create(title=title, text='Текст', author=author)
+    second = Note.objects.create(title=title, text='Текст', author=author)
+    max_length = Note._meta.get_field('slug').max_length
+    assert len(first.slug) == len(second.slug) == max_length
+    assert second.slug == first.slug[:max_length - 2] + '-2'
+
+
+def test_slug_collision_retried(author, note, monkeypatch):
+    from notes import models
+
+    allocated = []
+
+    def allocate_taken_first(model, title, exclude_pk=None):
+        # Первый подбор возвращает slug, который успела занять другая запись.
+        slug = 'new-slug' if allocated else note.slug
+        allocated.append(slug)
+        return slug
+
+    monkeypatch.setattr(models, 'allocate_slug', allocate_taken_first)
+    new_note = Note.objects.create(title='Тёзка', text='Текст', author=author)
+    assert allocated == [note.slug, 'new-slug']
+    assert new_note.slug == 'new-slug'
+
+
+def test_title_without_letters_gets_fallback_slug(author):
+    first = Note.objects.create(title='!!!', text='Текст', author=author)
+    second = Note.objects.create(title='😀', text='Текст', author=author)
+    assert (first.slug, second.slug) == ('note', 'note-2')
+
+
+def test_explicit_slug_checked_once(author, form_data,
+                                    django_assert_num_queries):
+    form = NoteForm(data=form_data, author=author)
+    with django_assert_num_queries(1):
+        assert form.is_valid()
+
+
+def test_create_saves_note_once(author_client, author, form_data):
+    author_client.post(reverse('notes:add'), data=form_data)
+    # Каждое сохранение берёт номер изменения и пишет версию текста.
+    assert ChangeCounter.objects.get(author=author).value == 1
+    assert Note.objects.get().revisions.count() == 1
@@ -0,0 +1,94 @@
+import pytest
+
+from django.urls import reverse
+
+from notes.markup import render_markdown
+from notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+
+def test_render_markdown():
+    html = render_markdown('# Заголовок\n\nТекст **жирный**')
+    assert '<h1>Заголовок</h1>' in html
+    assert '<strong>жирный</strong>' in html
+
+
+@pytest.mark.parametrize(
+    'text, unsafe',
+    (
+        ('<script>alert(1)</script>', '<script>'),
+        ('текст <b onclick="alert(1)">кнопка</b>', '<b '),
+        ('[ссылка](javascript:alert(1))', 'javascript:'),
+        ('![картинка](java\tscript:alert(1))', 'script:'),
+        ('[ссылка](&#106;avascript:alert(1))', 'avascript'),
+        ('[ссылка](&#x6A;avascript:alert(1))', 'avascript'),
+        ('[ссылка](javascript&colon;alert(1))', 'javascript'),
+        ('[ссылка](java&#x09;script:alert(1))', 'script'),
+    )
+)
+def test_raw_html_and_unsafe_links_are_dropped(text, unsafe):
+    assert unsafe not in render_markdown(text)
+
+
+def test_safe_links_keep_entities():
+    html = render_markdown('[ссылка](https://example.com/?a=1&amp;b=2)')
+    assert 'href="https://example.com/?a=1&amp;b=2"' in html
+
+
+def test_html_follows_text(note):
+    assert note.text_html == render_markdown(note.text)
+    note.text = '*Новый* текст'
+    note.save()
+    note.refresh_from_db()
+    assert note.text_html == '<p><em>Новый</em> текст</p>'
+
+
+def test_html_rendered_only_when_text_changes(note):
+    # Хеш текста не изменился: сохранённый HTML не пересчитывается.
+    Note.objects.filter(pk=note.pk).update(text_html='<p>кеш</p>')
+    note = Note.objects.get(pk=note.pk)
+    note.title = 'Другой заголовок'
+    note.save()
+    note.refresh_from_db()
+    assert note.text_html == '<p>кеш</p>'
+
+
+def test_update_fields_with_text_saves_html(note):
+    note.text = '`код`'
+    note.save(update_fields=('text',))
+    note.refresh_from_db()
+    assert note.text_html == '<p><code>код</code></p>'
+
+
+def test_detail_shows_rendered_html(author_client, note):
+    note.text = '**важно**'
+    note.save()
+    response = author_client.get(reverse('notes:detail', args=(note.slug,)))
+    assert '<strong>важно</strong>' in response.content.decode()
+
+
+def test_long_note_detail_shows_preview(settings, author_client, note):
+    settings.NOTES_TEXT_INLINE_LIMIT = 100
+    settings.NOTES_TEXT_PREVIEW_SIZE = 10
+    note.text = 'абвгдеёжзи' * 50
+    note.save()
+    response = author_client.get(reverse('notes:detail', args=(note.slug,)))
+    content = response.content.decode()
+    assert 'абвгдеёжзи…' in content
+    assert 'абвгдеёжзиа' not in content
+    assert reverse('notes:body', args=(note.slug,)) in content
+
+
+def test_body_is_streamed_in_chunks(
+    settings, author_client, note, django_assert_num_queries
+):
+    settings.NOTES_TEXT_CHUNK_SIZE = 100
+    note.text = 'строка текста\n\n' * 100
+    note.save()
+    response = author_client.get(reverse('notes:body', args=(note.slug,)))
+    assert response.streaming
+    chunks = len(range(0, len(note.text_html), 100))
+    with django_assert_num_queries(chunks):
+        content = b''.join(response.streaming_content).decode()
+    assert note.text_html in content
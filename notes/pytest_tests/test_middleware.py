@@ -0,0 +1,48 @@
+import pytest
+
+from django.urls import reverse
+
+from notes import metrics
+
+
+@pytest.fixture
+def sample_rate(settings):
+    def set_rate(rate):
+        settings.NOTES_METRICS_SAMPLE_RATE = rate
+        metrics.reset()
+    return set_rate
+
+
+def test_request_metrics_recorded(sample_rate, author_client, note):
+    sample_rate(1)
+    response = author_client.get(reverse('notes:list'))
+    labels = {'view': 'notes:list'}
+    queries, count = metrics.get_histogram('notes_request_db_queries',
+                                           **labels)
+    assert count == 1
+    assert queries > 0
+    render_time, _ = metrics.get_histogram('notes_request_render_seconds',
+                                           **labels)
+    assert render_time > 0
+    size, _ = metrics.get_histogram('notes_response_size_bytes', **labels)
+    assert size == len(response.content)
+
+
+def test_metrics_endpoint_exposes_histograms(
+        metrics_allowed, sample_rate, author_client
+):
+    sample_rate(1)
+    author_client.get(reverse('notes:list'))
+    content = author_client.get(reverse('notes:metrics')).content.decode()
+    assert '# TYPE notes_request_duration_seconds histogram' in content
+    assert (
+        'notes_request_duration_seconds_bucket{view="notes:list",le="+Inf"} 1'
+        in content
+    )
+
+
+def test_unsampled_requests_not_recorded(sample_rate, author_client):
+    sample_rate(0)
+    author_client.get(reverse('notes:list'))
+    assert metrics.get_histogram('notes_request_duration_seconds',
+                                 view='notes:list') == (0, 0)
@@ -0,0 +1,107 @@
+import pytest
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test.client import Client
+from django.urls import get_resolver, reverse
+
+from notes.imports import build_notes, insert_batch
+from notes.models import AuthorStats, Folder, NoteRevision, Tag
+from notes.pytest_tests.conftest import QUERY_BUDGETS
+from notes.search import search_notes
+
+NOTE_ROUTES = ('notes:edit', 'notes:detail', 'notes:body', 'notes:delete',
+               'notes:history', 'notes:api_detail')
+FOLDER_ROUTES = ('notes:folder_edit', 'notes:folder_delete')
+TAG_ROUTES = ('notes:tag_edit', 'notes:tag_delete')
+POST_ONLY_ROUTES = {'notes:bulk'}
+
+
+@pytest.fixture(
+    scope='module', params=(1, 1000), ids=lambda count: f'{count}-notes'
+)
+def reader(request, django_db_setup, django_db_blocker):
+    # Заметки создаются один раз на модуль во внешней транзакции,
+    # которая откатывается после модуля, как в setUpTestData.
+    count = request.param
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+        user = get_user_model().objects.create(username=f'Reader {count}')
+        # Через импорт: вместе с заметками появляются поисковый индекс,
+        # первые версии и сводка автора, как у настоящих данных.
+        notes, _ = build_notes(user, (
+            {
+                'title': f'Заметка {index}',
+                'text': 'Текст',
+                'slug': f'reader-{count}-{index}',
+            }
+            for index in range(count)
+        ))
+        insert_batch(notes)
+        # У одной заметки длинная история: версия восстанавливается
+        # через снимок и цепочку разниц.
+        note = user.note_set.order_by('id').first()
+        for index in range(settings.NOTES_REVISION_SNAPSHOT_INTERVAL + 5):
+            note.text = f'{note.text}\nСтрока {index}'
+            note.save()
+        Folder.objects.create(author=user, name='Папка')
+        Tag.objects.create(author=user, name='метка')
+    yield user
+    with django_db_blocker.unblock():
+        transaction.set_rollback(True)
+        atomic.__exit__(None, None, None)
+
+
+def route_args(reader, name):
+    if name in NOTE_ROUTES:
+        return (reader.note_set.values_list('slug', flat=True)[0],)
+    if name == 'notes:revision':
+        return NoteRevision.objects.filter(note__author=reader).order_by(
+            '-number'
+        ).values_list('note__slug', 'number')[0]
+    if name in FOLDER_ROUTES:
+        return (Folder.objects.get(author=reader).pk,)
+    if name in TAG_ROUTES:
+        return (Tag.objects.get(author=reader).pk,)
+    return ()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', QUERY_BUDGETS)
+def test_query_budget(metrics_allowed, reader, query_budget, name):
+    # Число запросов не растёт вместе с числом заметок.
+    client = Client()
+    client.force_login(reader)
+    url = reverse(name, args=route_args(reader, name))
+    data = {'q': 'Заметка'} if name == 'notes:search' else None
+    with query_budget(name):
+        response = client.get(url, data)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    assert response.status_code == 200
+
+
+def test_every_get_route_has_budget():
+    resolver = get_resolver()
+    names = {
+        f'{namespace}:{name}'
+        for namespace in ('notes', 'users')
+        for name in resolver.namespace_dict[namespace][1].reverse_dict
+        if isinstance(name, str)
+    }
+    assert names - POST_ONLY_ROUTES == set(QUERY_BUDGETS)
+
+
+@pytest.mark.django_db
+def test_reader_has_real_data(reader):
+    # Бюджеты меряют настоящие пути: поиск находит заметки, у заметок
+    # есть история, у автора - сводка.
+    assert search_notes(reader, 'Заметка', limit=1)
+    assert NoteRevision.objects.filter(note__author=reader).exists()
+    assert AuthorStats.objects.get(author=reader).note_count > 0
+    interval = settings.NOTES_REVISION_SNAPSHOT_INTERVAL
+    assert NoteRevision.objects.filter(
+        note__author=reader, number__gt=interval
+    ).exists()
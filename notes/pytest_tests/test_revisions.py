@@ -0,0 +1,128 @@
+import pytest
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes.models import Note, NoteRevision
+from notes.revisions import (
+    apply_delta, load_chain, make_delta, prune_revisions, revision_text,
+)
+
+pytestmark = pytest.mark.django_db
+
+TEXTS = (
+    '',
+    'одна строка',
+    'первая\nвторая\nтретья\n',
+    'первая\nновая\nтретья',
+    'Совсем\r\nдругой\nтекст\n\n',
+)
+
+
+@pytest.fixture
+def snapshot_interval(settings):
+    settings.NOTES_REVISION_SNAPSHOT_INTERVAL = 3
+    return settings.NOTES_REVISION_SNAPSHOT_INTERVAL
+
+
+def long_text(version):
+    lines = [f'Строка {index}\n' for index in range(200)]
+    lines[version] = f'Правка {version}\n'
+    return ''.join(lines)
+
+
+def edit(note, versions):
+    for version in versions:
+        note.text = long_text(version)
+        note.save()
+
+
+@pytest.mark.parametrize('old', TEXTS)
+@pytest.mark.parametrize('new', TEXTS)
+def test_delta_round_trip(old, new):
+    assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_every_version_is_restored(note, snapshot_interval):
+    edit(note, range(7))
+    assert note.revisions.count() == 8
+    for version in range(7):
+        assert revision_text(note.pk, version + 2) == long_text(version)
+
+
+def test_snapshots_bound_the_chain(note, snapshot_interval):
+    edit(note, range(7))
+    # Правки в одну строку хранятся разницами, снимок — каждая третья.
+    snapshots = [
+        revision.number for revision in note.revisions.order_by('number')
+        if revision.is_snapshot
+    ]
+    assert snapshots == [1, 4, 7]
+    for number in range(1, 9):
+        assert len(load_chain(note.pk, number)) <= snapshot_interval
+
+
+def test_delta_is_smaller_than_text(note):
+    edit(note, range(2))
+    revision = note.revisions.get(number=3)
+    assert not revision.is_snapshot
+    assert len(revision.data) < len(long_text(1).encode()) // 20
+
+
+def test_save_without_text_change_keeps_history(note):
+    note.title = 'Новый заголовок'
+    note.save()
+    note.save(update_fields=('title',))
+    assert note.revisions.count() == 1
+
+
+def test_prune_keeps_restorable_history(note, snapshot_interval):
+    edit(note, range(7))
+    assert prune_revisions([note.pk], keep=3) == 5
+    assert list(note.revisions.values_list('number', flat=True).order_by(
+        'number'
+    )) == [6, 7, 8]
+    assert note.revisions.get(number=6).is_snapshot
+    for number in (6, 7, 8):
+        assert revision_text(note.pk, number) == long_text(number - 2)
+
+
+def test_prune_command_keeps_recent(note, snapshot_interval):
+    edit(note, range(4))
+    call_command('prune_note_revisions', keep=1, days=1, verbosity=0)
+    assert note.revisions.count() == 5
+    call_command('prune_note_revisions', keep=1, batch_size=1, verbosity=0)
+    assert list(note.revisions.values_list('number', flat=True)) == [5]
+    assert revision_text(note.pk, 5) == note.text
+
+
+def test_history_page(author_client, note):
+    edit(note, range(2))
+    response = author_client.get(reverse('notes:history', args=(note.slug,)))
+    numbers = [revision.number for revision in response.context['revisions']]
+    assert numbers == [3, 2, 1]
+
+
+def test_revision_diff(author_client, note):
+    edit(note, range(2))
+    url = reverse('notes:revision', args=(note.slug, 3))
+    diff = author_client.get(url).context['diff']
+    assert '-Правка 0' in diff
+    assert '+Правка 1' in diff
+
+
+@pytest.mark.parametrize('number', (0, 5))
+def test_missing_revision(author_client, note, number):
+    url = reverse('notes:revision', args=(note.slug, number))
+    assert author_client.get(url).status_code == 404
+
+
+def test_revisions_are_private(not_author_client, note):
+    url = reverse('notes:revision', args=(note.slug, 1))
+    assert not_author_client.get(url).status_code == 404
+
+
+def test_note_deletion_drops_history(note):
+    note.delete()
+    assert not NoteRevision.objects.exists()
+    assert not Note.objects.exists()
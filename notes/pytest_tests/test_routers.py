@@ -0,0 +1,140 @@
+from io import StringIO
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.urls import reverse
+
+from notes.bulk import bulk_delete
+from notes.checks import check_shared_caches
+from notes.models import Folder, Note
+from notes.routers import (
+    ReplicaRouter, get_replica_cache, is_pinned, replica_reads,
+)
+
+pytestmark = pytest.mark.django_db
+
+REPLICA = 'replica1'
+LIST_URL = reverse('notes:list')
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.NOTES_DB_REPLICAS = [REPLICA]
+
+
+@pytest.fixture
+def replica_file(replicas, tmp_path):
+    """Второй файл SQLite вместо реплики, копия основной базы теста."""
+    connections.settings[REPLICA] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    call_command('sync_sqlite_replicas', pages=0, stdout=StringIO())
+    yield
+    connections[REPLICA].close()
+    del connections.settings[REPLICA]
+    delattr(connections._connections, REPLICA)
+
+
+def test_router_reads_notes_from_replica_in_read_views(replicas):
+    router = ReplicaRouter()
+    assert router.db_for_read(Note) is None
+    token = replica_reads.set(True)
+    try:
+        assert router.db_for_read(Note) == REPLICA
+        # Пользователи и сессии всегда из основной базы.
+        assert router.db_for_read(get_user_model()) is None
+        assert router.db_for_write(Note) == 'default'
+    finally:
+        replica_reads.reset(token)
+    assert router.allow_migrate(REPLICA, 'notes') is False
+    assert router.allow_migrate('default', 'notes') is None
+
+
+def test_write_pins_author_to_primary(replicas, author, not_author, note):
+    assert is_pinned(author.pk)
+    assert not is_pinned(not_author.pk)
+
+
+def test_bulk_delete_pins_author(replicas, author, note, settings):
+    settings.NOTES_REPLICA_STICKY_SECONDS = 0
+    note.save()
+    assert not is_pinned(author.pk)
+    settings.NOTES_REPLICA_STICKY_SECONDS = 10
+    bulk_delete(author, [note.pk], chunk_size=10)
+    assert is_pinned(author.pk)
+
+
+def test_local_pin_cache_rejected_for_many_workers(
+        settings, replicas, tmp_path
+):
+    settings.NOTES_SINGLE_WORKER = False
+    settings.CACHES = {
+        **{
+            alias: {
+                'BACKEND': 'notes.cache_backends.FileCache',
+                'LOCATION': str(tmp_path / alias),
+            }
+            for alias in ('default', 'state')
+        },
+        'local': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+    assert check_shared_caches(None) == []
+    settings.NOTES_REPLICA_CACHE_ALIAS = 'local'
+    errors = check_shared_caches(None)
+    assert [error.msg.partition(' ')[0] for error in errors] == [
+        'NOTES_REPLICA_CACHE_ALIAS'
+    ]
+    settings.NOTES_DB_REPLICAS = []
+    assert check_shared_caches(None) == []
+
+
+def test_no_pin_without_replicas(author, note):
+    assert not is_pinned(author.pk)
+
+
+def test_reads_come_from_replica(replica_file, author, author_client):
+    # Заметка записана только в реплику: раз список её показывает, он
+    # читается с реплики. bulk_create не закрепляет автора за основной базой.
+    Note.objects.using(REPLICA).bulk_create([
+        Note(title='С реплики', text='Текст', slug='replica', author=author)
+    ])
+    response = author_client.get(LIST_URL)
+    assert [note.slug for note in response.context['object_list']] == [
+        'replica'
+    ]
+    assert not Note.objects.exists()
+
+
+def test_templates_read_from_replica(replica_file, author, author_client):
+    # Папки выбираются лениво, уже при рендере шаблона.
+    Folder.objects.using(REPLICA).bulk_create([
+        Folder(author=author, name='Папка с реплики')
+    ])
+    response = author_client.get(LIST_URL)
+    assert 'Папка с реплики' in response.content.decode()
+    assert not Folder.objects.exists()
+
+
+def test_author_reads_own_writes(replica_file, author, author_client, note):
+    detail_url = reverse('notes:detail', args=(note.slug,))
+    # Заметка создана после копии базы в реплику.
+    assert author_client.get(detail_url).status_code == 200
+    get_replica_cache().clear()
+    author_client.force_login(author)
+    assert author_client.get(detail_url).status_code == 404
+
+
+def test_writes_go_to_primary(replica_file, author_client, form_data):
+    author_client.post(reverse('notes:add'), data=form_data)
+    assert Note.objects.using('default').filter(
+        slug=form_data['slug']
+    ).exists()
+    assert not Note.objects.using(REPLICA).filter(
+        slug=form_data['slug']
+    ).exists()
@@ -18,7 +18,8 @@ def test_pages_availability_for_anonymous_user(client, name):
 
 @pytest.mark.parametrize(
     'name',
-    ('notes:list', 'notes:add', 'notes:success')
+    ('notes:list', 'notes:add', 'notes:success', 'notes:search',
+     'notes:export')
 )
 def test_pages_availability_for_auth_user(not_author_client, name):
     url = reverse(name)
@@ -48,7 +49,9 @@ def test_pages_availability_for_author(author_client, name, note):
     (
         ('notes:detail', pytest.lazy_fixture('slug_for_args')),
         ('notes:edit', pytest.lazy_fixture('slug_for_args')),
-        ('notes:delete', pytest.lazy_fixture('slug_for_args'))
+        ('notes:delete', pytest.lazy_fixture('slug_for_args')),
+        ('notes:body', pytest.lazy_fixture('slug_for_args')),
+        ('notes:history', pytest.lazy_fixture('slug_for_args')),
     )
 )
 def test_pages_availability_for_different_users(
@@ -65,9 +68,13 @@ def test_pages_availability_for_different_users(
         ('notes:detail', pytest.lazy_fixture('slug_for_args')),
         ('notes:edit', pytest.lazy_fixture('slug_for_args')),
         ('notes:delete', pytest.lazy_fixture('slug_for_args')),
+        ('notes:body', pytest.lazy_fixture('slug_for_args')),
+        ('notes:history', pytest.lazy_fixture('slug_for_args')),
         ('notes:add', None),
         ('notes:success', None),
         ('notes:list', None),
+        ('notes:search', None),
+        ('notes:export', None),
     )
 )
 def test_redirect(client, name, args):
@@ -76,3 +83,18 @@ def test_redirect(client, name, args):
     expected_url = f'{login_url}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+def test_metrics_closed_to_anonymous(client):
+    response = client.get(reverse('notes:metrics'))
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_metrics_open_to_allowed_ip(metrics_allowed, client):
+    response = client.get(reverse('notes:metrics'))
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_metrics_open_to_staff(admin_client):
+    response = admin_client.get(reverse('notes:metrics'))
+    assert response.status_code == HTTPStatus.OK
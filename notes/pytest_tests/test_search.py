@@ -0,0 +1,129 @@
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from notes.search import FTS5Backend, TokenBackend, tokenize
+
+SEARCH_URL = reverse('notes:search')
+
+
+@pytest.fixture
+def notes(author):
+    # Слово «кот» в заголовке должно весить больше, чем в тексте:
+    in_text = Note.objects.create(
+        title='Про собак', text='И немного про кот', slug='dogs', author=author
+    )
+    in_title = Note.objects.create(
+        title='Кот', text='Кот спит весь день', slug='cats', author=author
+    )
+    return in_title, in_text
+
+
+def test_search_finds_notes_by_rank(author_client, notes):
+    response = author_client.get(SEARCH_URL, {'q': 'КОТ'})
+    assert list(response.context['object_list']) == list(notes)
+
+
+def test_search_only_own_notes(not_author_client, notes):
+    response = not_author_client.get(SEARCH_URL, {'q': 'кот'})
+    assert list(response.context['object_list']) == []
+
+
+def test_search_ignores_query_syntax(author_client, notes):
+    response = author_client.get(SEARCH_URL, {'q': 'кот" OR NEAR(*'})
+    assert response.context['object_list'] == []
+
+
+def test_search_index_follows_changes(author_client, notes):
+    in_title, in_text = notes
+    in_title.title = 'Спячка'
+    in_title.text = 'Весь день'
+    in_title.save()
+    in_text.delete()
+    response = author_client.get(SEARCH_URL, {'q': 'кот'})
+    assert response.context['object_list'] == []
+    response = author_client.get(SEARCH_URL, {'q': 'спячка'})
+    assert response.context['object_list'] == [in_title]
+
+
+@pytest.mark.parametrize('backend_class', (FTS5Backend, TokenBackend))
+def test_search_backends(author, notes, backend_class):
+    backend = backend_class()
+    backend.clear()
+    for note in notes:
+        backend.index(note)
+    expected_ids = [note.id for note in notes]
+    assert backend.search(author, 'кот', limit=10) == expected_ids
+    assert backend.search(author, 'кот день', limit=10) == expected_ids[:1]
+    backend.remove(expected_ids[:1])
+    assert backend.search(author, 'кот', limit=10) == expected_ids[1:]
+
+
+def fts_queries(queries):
+    return [query for query in queries if 'notes_note_fts' in query['sql']]
+
+
+def test_save_reindexes_only_changed_search_fields(author, notes):
+    in_title, _ = notes
+    note = Note.objects.get(pk=in_title.pk)
+    with CaptureQueriesContext(connection) as queries:
+        note.save()
+    assert fts_queries(queries) == []
+    note.title = 'Спячка'
+    with CaptureQueriesContext(connection) as queries:
+        note.save()
+    assert len(fts_queries(queries)) == 2
+    assert FTS5Backend().search(author, 'спячка', limit=10) == [note.id]
+    assert FTS5Backend().search(author, 'кот', limit=10) == [
+        note.id, notes[1].id
+    ]
+
+
+def test_create_does_not_delete_from_index(author):
+    with CaptureQueriesContext(connection) as queries:
+        Note.objects.create(title='Новая', text='Текст', author=author)
+    assert not [
+        query for query in fts_queries(queries) if 'DELETE' in query['sql']
+    ]
+    assert len(fts_queries(queries)) == 1
+
+
+def test_fts_does_not_copy_text(notes):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'notes_note_fts'"
+        )
+        assert "content='notes_note'" in cursor.fetchone()[0]
+    FTS5Backend().clear()
+    call_command('rebuild_search_index')
+    # Таблицы notes_note_fts_content с копией текста нет.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE 'notes_note_fts%'"
+        )
+        assert 'notes_note_fts_content' not in {
+            row[0] for row in cursor.fetchall()
+        }
+
+
+def test_fts_remove_in_batches(
+        author, notes, monkeypatch, django_assert_num_queries
+):
+    monkeypatch.setattr('notes.search.REMOVE_BATCH_SIZE', 1)
+    with django_assert_num_queries(2):
+        FTS5Backend().remove(note.id for note in notes)
+    assert FTS5Backend().search(author, 'кот', limit=10) == []
+
+
+def test_rebuild_search_index(author, notes):
+    FTS5Backend().clear()
+    call_command('rebuild_search_index')
+    assert FTS5Backend().search(author, 'собак', limit=10) == [notes[1].id]
+
+
+def test_tokenize():
+    assert tokenize('Snake_case, Ёлка!') == ['snake', 'case', 'ёлка']
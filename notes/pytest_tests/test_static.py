@@ -0,0 +1,96 @@
+import gzip
+import json
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.urls import reverse
+
+from notes import storage
+from notes.checks import check_static_manifest, require_static_manifest
+from notes.storage import accepted_encodings
+from notes.views import IMMUTABLE
+
+CSS = 'css/bootstrap-subset.css'
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = 'notes.storage.CompressedManifestStorage'
+    call_command('collectstatic', interactive=False, verbosity=0)
+    manifest = json.loads((tmp_path / 'staticfiles.json').read_text())
+    return tmp_path, manifest['paths'][CSS]
+
+
+def test_collectstatic_compresses_hashed_files(collected):
+    root, hashed = collected
+    original = (root / hashed).read_bytes()
+    compressed = (root / f'{hashed}.gz').read_bytes()
+    assert gzip.decompress(compressed) == original
+    assert len(compressed) < len(original)
+    # Копии без хеша в имени не сжимаются:
+    assert not (root / f'{CSS}.gz').exists()
+    assert (root / f'{hashed}.br').exists() == (storage.brotli is not None)
+
+
+def test_hashed_file_is_immutable(client, collected):
+    response = client.get(static(CSS), HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Cache-Control'] == IMMUTABLE
+    assert response['Content-Type'] == 'text/css'
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response['Vary']
+    body = gzip.decompress(b''.join(response.streaming_content))
+    assert body == (collected[0] / collected[1]).read_bytes()
+
+
+def test_plain_file_without_accept_encoding(client, collected):
+    response = client.get(f'/static/{CSS}')
+    assert response['Cache-Control'] == 'no-cache'
+    assert not response.has_header('Content-Encoding')
+
+
+def test_not_modified(client, collected):
+    url = static(CSS)
+    last_modified = client.get(url)['Last-Modified']
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize('path', ('css/missing.css', '../manage.py'))
+def test_missing_files(client, collected, path):
+    assert client.get(f'/static/{path}').status_code == 404
+
+
+@pytest.mark.parametrize('header, expected', (
+    ('gzip, deflate, br', {'gzip', 'deflate', 'br'}),
+    ('br;q=0, gzip;q=0.5', {'gzip'}),
+    ('', set()),
+))
+def test_accepted_encodings(header, expected):
+    assert accepted_encodings(header) == expected
+
+
+@pytest.mark.django_db
+def test_pages_use_local_css(client):
+    content = client.get(reverse('notes:home')).content.decode()
+    assert static(CSS) in content
+    assert 'cdn.jsdelivr.net' not in content
+
+
+def test_missing_manifest_stops_startup(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = 'notes.storage.CompressedManifestStorage'
+    assert [error.id for error in check_static_manifest(None)] == [
+        'notes.E002'
+    ]
+    with pytest.raises(ImproperlyConfigured, match='collectstatic'):
+        require_static_manifest()
+    settings.DEBUG = True
+    assert check_static_manifest(None) == []
+
+
+def test_collected_manifest_passes_check(collected):
+    assert check_static_manifest(None) == []
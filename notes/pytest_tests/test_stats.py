@@ -0,0 +1,77 @@
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from notes.models import AuthorStats, Note
+from notes.stats import get_stats
+
+pytestmark = pytest.mark.django_db
+
+
+def stats_of(author):
+    stats = get_stats(author)
+    return stats.note_count, stats.text_bytes
+
+
+def test_stats_follow_notes(author):
+    note = Note.objects.create(title='Первая', text='абв', author=author)
+    Note.objects.create(title='Вторая', text='abc', author=author)
+    # Кириллица занимает два байта в UTF-8.
+    assert stats_of(author) == (2, 9)
+    note = Note.objects.get(pk=note.pk)
+    note.text = 'а'
+    note.save()
+    assert stats_of(author) == (2, 5)
+    note.delete()
+    assert stats_of(author) == (1, 3)
+    assert get_stats(author).last_modified is not None
+
+
+def test_title_change_keeps_bytes(note, author):
+    note = Note.objects.get(pk=note.pk)
+    note.title = 'Новый заголовок'
+    note.save(update_fields=('title',))
+    assert stats_of(author) == (1, len(note.text.encode()))
+
+
+def test_delete_view_counts_deferred_text(author_client, note, author):
+    author_client.post(reverse('notes:delete', args=(note.slug,)))
+    assert stats_of(author) == (0, 0)
+
+
+def test_import_updates_stats(author, tmp_path):
+    path = tmp_path / 'notes.csv'
+    path.write_text('title,text\nА,Текст\nБ,Ещё\n', encoding='utf-8')
+    call_command('import_notes', author.username, path, verbosity=0)
+    assert stats_of(author) == (2, len('ТекстЕщё'.encode()))
+
+
+def test_recompute_command_fixes_drift(note, author):
+    AuthorStats.objects.filter(author=author).update(
+        note_count=100, text_bytes=0
+    )
+    call_command('recompute_note_stats', batch_size=1, verbosity=0)
+    assert stats_of(author) == (1, len(note.text.encode()))
+
+
+def test_author_deletion_leaves_no_stats(note, author):
+    author.delete()
+    assert not AuthorStats.objects.exists()
+    connection.check_constraints()
+
+
+def test_home_and_api_show_stats(author_client, note):
+    response = author_client.get(reverse('notes:home'))
+    assert response.context['stats'].note_count == 1
+    response = author_client.get(reverse('notes:api_stats'))
+    data = response.json()
+    assert data['note_count'] == 1
+    assert data['text_bytes'] == len(note.text.encode())
+    assert data['last_modified'] == note.updated.isoformat()
+
+
+def test_home_for_anonymous_has_no_stats(client):
+    response = client.get(reverse('notes:home'))
+    assert 'stats' not in response.context
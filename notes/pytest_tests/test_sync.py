@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from notes.models import Note
+
+SYNC_URL = reverse('notes:sync')
+
+
+def test_sync_returns_all_changes_in_order(author_client, author, note):
+    second = Note.objects.create(title='Вторая', text='Текст', author=author)
+    data = author_client.get(SYNC_URL).json()
+    assert [item['id'] for item in data['changed']] == [note.id, second.id]
+    assert data['deleted'] == []
+    assert data['since'] == second.change_seq
+    assert data['has_more'] is False
+
+
+def test_sync_returns_only_delta(author_client, author, note):
+    since = author_client.get(SYNC_URL).json()['since']
+    data = author_client.get(SYNC_URL, {'since': since}).json()
+    assert data['changed'] == []
+    note.text = 'Новый текст'
+    note.save()
+    deleted = Note.objects.create(title='Удалить', text='-', author=author)
+    deleted_id = deleted.id
+    deleted.delete()
+    data = author_client.get(SYNC_URL, {'since': since}).json()
+    assert [item['text'] for item in data['changed']] == ['Новый текст']
+    assert [item['id'] for item in data['deleted']] == [deleted_id]
+    assert data['since'] > since
+
+
+def test_sync_in_batches(author_client, author, note):
+    for index in range(4):
+        Note.objects.create(title=f'Заметка {index}', text='-', author=author)
+    seen, since, has_more = [], -1, True
+    while has_more:
+        data = author_client.get(
+            SYNC_URL, {'since': since, 'limit': 2}
+        ).json()
+        assert len(data['changed']) <= 2
+        seen.extend(item['id'] for item in data['changed'])
+        since, has_more = data['since'], data['has_more']
+    assert sorted(seen) == sorted(Note.objects.values_list('id', flat=True))
+
+
+def test_sync_only_own_changes(not_author_client, note):
+    assert not_author_client.get(SYNC_URL).json()['changed'] == []
+
+
+def test_sync_bad_cursor(author_client):
+    response = author_client.get(SYNC_URL, {'since': 'abc'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_change_seq_is_monotonic(author, note):
+    first_seq = note.change_seq
+    note.save(update_fields=['title'])
+    note.refresh_from_db()
+    assert note.change_seq > first_seq
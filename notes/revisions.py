@@ -0,0 +1,157 @@
+"""История текста заметок.
+
+Версии сжаты zlib. Снимок хранит текст целиком, остальные версии —
+разницу по строкам с предыдущей версией. Снимок пишется не реже чем раз
+в NOTES_REVISION_SNAPSHOT_INTERVAL версий, поэтому для восстановления
+любой версии нужно не больше этого числа записей.
+"""
+import difflib
+import json
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q, Subquery
+
+from .models import NoteRevision
+
+
+def make_delta(old, new):
+    """Разница по строкам: диапазоны строк old и вставленный текст."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j1 != j2:
+            ops.append(''.join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old, ops):
+    old_lines = old.splitlines(keepends=True)
+    return ''.join(
+        ''.join(old_lines[op[0]:op[1]]) if isinstance(op, list) else op
+        for op in ops
+    )
+
+
+def pack_text(text):
+    return zlib.compress(text.encode())
+
+
+def pack_delta(ops):
+    return zlib.compress(
+        json.dumps(ops, ensure_ascii=False, separators=(',', ':')).encode()
+    )
+
+
+def load_chain(note_id, number=None):
+    """Версии от ближайшего снимка до number (до последней при None)."""
+    revisions = NoteRevision.objects.filter(note_id=note_id)
+    target = revisions.order_by('-number')
+    if number is not None:
+        revisions = revisions.filter(number__lte=number)
+        target = target.filter(number=number)
+    return list(revisions.filter(
+        number__gte=Subquery(target.values('base')[:1])
+    ).order_by('number'))
+
+
+def replay(chain):
+    """Проходит цепочку версий, отдаёт пары (версия, её текст)."""
+    text = ''
+    for revision in chain:
+        data = zlib.decompress(revision.data)
+        if revision.is_snapshot:
+            text = data.decode()
+        else:
+            text = apply_delta(text, json.loads(data))
+        yield revision, text
+
+
+def revision_text(note_id, number):
+    text = None
+    for _, text in replay(load_chain(note_id, number)):
+        pass
+    return text
+
+
+def record_revision(note):
+    """Записывает текущий текст заметки новой версией."""
+    last = previous_text = None
+    for last, previous_text in replay(load_chain(note.pk)):
+        pass
+    revision = NoteRevision(note=note, text_bytes=len(note.text.encode()))
+    if last is None:
+        revision.number = revision.base = 1
+    else:
+        revision.number = last.number + 1
+        revision.base = last.base
+    interval = settings.NOTES_REVISION_SNAPSHOT_INTERVAL
+    delta = None
+    if last is not None and revision.number - last.base < interval:
+        delta = pack_delta(make_delta(previous_text, note.text))
+    if delta is None or len(delta) * 4 > revision.text_bytes:
+        # Текст переписан почти целиком: снимок выйдет не больше разницы
+        # и укоротит цепочки следующих версий.
+        revision.base = revision.number
+        revision.data = pack_text(note.text)
+    else:
+        revision.data = delta
+    revision.save()
+    return revision
+
+
+def record_first_revisions(notes):
+    """Снимки только что созданных заметок одним запросом."""
+    NoteRevision.objects.bulk_create(
+        NoteRevision(
+            note_id=note.pk,
+            number=1,
+            base=1,
+            data=pack_text(note.text),
+            text_bytes=len(note.text.encode()),
+        )
+        for note in notes
+    )
+
+
+def cut_history(note_id, cutoff):
+    """Удаляет версии до cutoff; версия cutoff становится снимком."""
+    with transaction.atomic():
+        revisions = NoteRevision.objects.filter(note_id=note_id)
+        for first, text in replay(load_chain(note_id, cutoff)):
+            pass
+        if not first.is_snapshot:
+            revisions.filter(pk=first.pk).update(
+                base=cutoff, data=pack_text(text)
+            )
+            revisions.filter(number__gt=cutoff, base__lt=cutoff).update(
+                base=cutoff
+            )
+        deleted, _ = revisions.filter(number__lt=cutoff).delete()
+    return deleted
+
+
+def prune_revisions(note_ids, keep, before=None):
+    """Оставляет заметкам последние keep версий и все версии новее before.
+
+    Возвращает число удалённых версий.
+    """
+    bounds = {'first': Min('number'), 'last': Max('number')}
+    if before is not None:
+        bounds['recent'] = Min('number', filter=Q(created__gte=before))
+    rows = list(NoteRevision.objects.filter(note_id__in=note_ids).values(
+        'note_id'
+    ).annotate(**bounds).order_by())
+    deleted = 0
+    for row in rows:
+        cutoff = row['last'] - keep + 1
+        if row.get('recent') is not None:
+            cutoff = min(cutoff, row['recent'])
+        if cutoff > row['first']:
+            deleted += cut_history(row['note_id'], cutoff)
+    return deleted
@@ -0,0 +1,118 @@
+"""Чтение с реплик, запись в основную базу.
+
+На реплики уходят только запросы к моделям заметок из представлений
+чтения, помеченных replica_view. Пользователи, сессии и всё, что читается
+при записи, берутся из основной базы. После изменения заметок автор
+NOTES_REPLICA_STICKY_SECONDS секунд читает из основной базы: реплика могла
+ещё не догнать его запись. Закрепление хранится в кеше
+NOTES_REPLICA_CACHE_ALIAS, общем для всех процессов (проверка notes.E001).
+"""
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from .metrics import render_timed
+
+PRIMARY_KEY = 'notes:primary:{author_id}'
+SAFE_METHODS = ('GET', 'HEAD')
+
+replica_reads = ContextVar('notes_replica_reads', default=False)
+
+
+def get_replica_cache():
+    return caches[settings.NOTES_REPLICA_CACHE_ALIAS]
+
+
+def pin_primary(author_id):
+    """Направляет чтение автора в основную базу на время отставания реплик."""
+    if settings.NOTES_DB_REPLICAS:
+        get_replica_cache().set(
+            PRIMARY_KEY.format(author_id=author_id),
+            True,
+            timeout=settings.NOTES_REPLICA_STICKY_SECONDS,
+        )
+
+
+def is_pinned(author_id):
+    return bool(
+        get_replica_cache().get(PRIMARY_KEY.format(author_id=author_id))
+    )
+
+
+def reads_from_replica(request):
+    if not settings.NOTES_DB_REPLICAS or request.method not in SAFE_METHODS:
+        return False
+    user = request.user
+    return not (user.is_authenticated and is_pinned(user.pk))
+
+
+def iter_on_replica(content):
+    # Тело потокового ответа читается уже после выхода из представления,
+    # поэтому разрешение читать с реплики ставится на каждый кусок.
+    iterator = iter(content)
+    while True:
+        token = replica_reads.set(True)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            replica_reads.reset(token)
+        yield chunk
+
+
+def replica_view(view):
+    """Разрешает представлению чтения брать заметки с реплики."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not reads_from_replica(request):
+            return view(request, *args, **kwargs)
+        token = replica_reads.set(True)
+        try:
+            response = view(request, *args, **kwargs)
+            # Ленивые выборки шаблона (папки, формы, object_list) тоже
+            # должны читаться с реплики: рендерим, пока разрешение действует.
+            if (callable(getattr(response, 'render', None))
+                    and not response.is_rendered):
+                render_timed(response)
+        finally:
+            replica_reads.reset(token)
+        if response.streaming:
+            response.streaming_content = iter_on_replica(
+                response.streaming_content
+            )
+        return response
+    return wrapper
+
+
+class ReplicaRouter:
+    """Роутер DATABASE_ROUTERS для реплик из NOTES_DB_REPLICAS."""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.NOTES_DB_REPLICAS
+        if (
+            replicas
+            and replica_reads.get()
+            and model._meta.app_label == 'notes'
+        ):
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Без явного ответа Django пишет туда, откуда объект прочитан.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.NOTES_DB_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.NOTES_DB_REPLICAS:
+            return False
+        return None
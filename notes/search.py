@@ -0,0 +1,154 @@
+import re
+from collections import Counter
+
+from django.db import connection, connections, router
+from django.db.models import Count, Sum
+
+from .models import Note, SearchToken
+
+FTS_TABLE = 'notes_note_fts'
+TITLE_WEIGHT = 3
+# Старые сборки SQLite принимают не больше 999 параметров в запросе.
+REMOVE_BATCH_SIZE = 500
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def tokenize(text):
+    """Разбивает текст на слова так же, как токенизатор unicode61."""
+    max_length = SearchToken._meta.get_field('token').max_length
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if len(token) <= max_length
+    ]
+
+
+class FTS5Backend:
+    """Индекс в виртуальной таблице SQLite FTS5.
+
+    Таблица с внешним содержимым (content='notes_note'): текст хранится
+    только в заметках, в индексе - одни слова. Поэтому удалять заметку из
+    индекса нужно до того, как изменится или удалится её строка: FTS5
+    берёт из неё слова, которые надо вычеркнуть. Заметки, записанные в
+    обход сигналов, добавляет в индекс rebuild_search_index.
+    """
+
+    def index(self, note):
+        self.index_many([note])
+
+    def index_many(self, notes):
+        """Добавляет в индекс заметки, которых в нём ещё нет."""
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [(note.pk, note.title, note.text) for note in notes],
+            )
+
+    def remove(self, note_ids):
+        note_ids = list(note_ids)
+        with connection.cursor() as cursor:
+            for start in range(0, len(note_ids), REMOVE_BATCH_SIZE):
+                batch = note_ids[start:start + REMOVE_BATCH_SIZE]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                    batch,
+                )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('delete-all')"
+            )
+
+    def search(self, author, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Каждое слово в кавычках: пользовательский ввод не должен
+        # интерпретироваться как синтаксис запросов FTS5.
+        match = ' '.join(f'"{token}"' for token in tokens)
+        if author is None:
+            sql = (
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1) LIMIT %s'
+            )
+            params = [match, limit]
+        else:
+            sql = (
+                f'SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} '
+                f'JOIN notes_note ON notes_note.id = {FTS_TABLE}.rowid '
+                f'WHERE {FTS_TABLE} MATCH %s AND notes_note.author_id = %s '
+                f'ORDER BY bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1) LIMIT %s'
+            )
+            params = [match, author.pk, limit]
+        # Поиск - чтение: в представлениях чтения он идёт на реплику.
+        with connections[router.db_for_read(Note)].cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+class TokenBackend:
+    """Инвертированный индекс в таблице SearchToken для остальных СУБД."""
+
+    def index(self, note):
+        self.index_many([note])
+
+    def index_many(self, notes):
+        tokens = []
+        for note in notes:
+            weights = Counter(tokenize(note.text))
+            for token in tokenize(note.title):
+                weights[token] += TITLE_WEIGHT
+            tokens.extend(
+                SearchToken(
+                    author_id=note.author_id,
+                    note_id=note.pk,
+                    token=token,
+                    weight=weight,
+                )
+                for token, weight in weights.items()
+            )
+        SearchToken.objects.bulk_create(tokens)
+
+    def remove(self, note_ids):
+        SearchToken.objects.filter(note_id__in=list(note_ids)).delete()
+
+    def clear(self):
+        SearchToken.objects.all().delete()
+
+    def search(self, author, query, limit):
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        found = SearchToken.objects.filter(token__in=tokens)
+        if author is not None:
+            found = found.filter(author=author)
+        return list(
+            found.values('note_id')
+            .annotate(matched=Count('id'), score=Sum('weight'))
+            .filter(matched=len(tokens))
+            .order_by('-score', '-note_id')
+            .values_list('note_id', flat=True)[:limit]
+        )
+
+
+def get_backend():
+    """Выбирает реализацию индекса по текущей СУБД.
+
+    search(None, ...) ищет по заметкам всех авторов, для админки.
+    """
+    if connection.vendor == 'sqlite':
+        return FTS5Backend()
+    return TokenBackend()
+
+
+def search_notes(author, query, limit):
+    """Заметки автора, найденные по запросу, в порядке релевантности."""
+    note_ids = get_backend().search(author, query, limit)
+    notes = (
+        Note.objects.filter(author=author)
+        .only('id', 'slug', 'title')
+        .in_bulk(note_ids)
+    )
+    return [notes[note_id] for note_id in note_ids if note_id in notes]
@@ -0,0 +1,298 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial, wraps
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import metrics
+from .auth import forget_user, remember_user
+from .cache import bump_version
+from .functions import OctetLength
+from .models import (
+    AuthorStats, ChangeCounter, Folder, Note, NoteTombstone, Tag,
+)
+from .revisions import record_first_revisions, record_revision
+from .routers import pin_primary
+from .search import get_backend
+from .stats import shift_stats
+
+SEARCH_FIELDS = {'title', 'text'}
+FOLDER_FIELDS = {'folder', 'folder_id'}
+
+# bulk_create не шлёт post_save: после пачки шлётся один этот сигнал
+# со списком сохранённых заметок (с заполненными pk).
+notes_bulk_created = Signal()
+
+# Пакетные операции сами обновляют индекс, счётчики и надгробия одним
+# запросом на пачку, поэтому сигналы удаления отдельных заметок глушат.
+deletion_muted = ContextVar('notes_deletion_muted', default=False)
+
+
+@contextmanager
+def mute_deletion_signals():
+    token = deletion_muted.set(True)
+    try:
+        yield
+    finally:
+        deletion_muted.reset(token)
+
+
+def unless_muted(receiver_function):
+    @wraps(receiver_function)
+    def wrapper(*args, **kwargs):
+        if not deletion_muted.get():
+            return receiver_function(*args, **kwargs)
+    return wrapper
+
+
+def search_fields_changed(instance, update_fields):
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return False
+    # text_changed выставляет Note.save по хешу текста.
+    return instance.text_changed or (
+        getattr(instance, 'loaded_title', None) != instance.title
+    )
+
+
+@receiver(pre_save, sender=Note)
+def unindex_changed_note(sender, instance, update_fields=None, **kwargs):
+    """Вычёркивает из индекса старые заголовок и текст, пока они в базе."""
+    instance.search_changed = (
+        not instance._state.adding
+        and search_fields_changed(instance, update_fields)
+    )
+    if instance.search_changed:
+        get_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Note)
+def index_note(sender, instance, created, **kwargs):
+    """Индексирует новую заметку или заметку с новым заголовком, текстом."""
+    if created or instance.search_changed:
+        get_backend().index(instance)
+    instance.loaded_title = instance.title
+
+
+@receiver(notes_bulk_created, sender=Note)
+def index_notes(sender, notes, **kwargs):
+    """Индексирует пачку заметок, созданных через bulk_create."""
+    get_backend().index_many(notes)
+
+
+@receiver(post_save, sender=Note)
+def save_revision(sender, instance, **kwargs):
+    """Записывает версию текста в транзакции сохранения заметки."""
+    if getattr(instance, 'text_changed', False):
+        record_revision(instance)
+
+
+@receiver(notes_bulk_created, sender=Note)
+def save_first_revisions(sender, notes, **kwargs):
+    record_first_revisions(notes)
+
+
+@receiver(pre_delete, sender=Note)
+@unless_muted
+def unindex_note(sender, instance, **kwargs):
+    """Удаляет заметку из поискового индекса, пока её строка в базе."""
+    get_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+@receiver(post_save, sender=Folder)
+@receiver(post_delete, sender=Folder)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Note.tags.through)
+@unless_muted
+def invalidate_pages(sender, instance, **kwargs):
+    """Сбрасывает закешированные страницы автора заметки, папки, метки.
+
+    Версия сдвигается после коммита: иначе чтение до коммита закешировало
+    бы старые данные под новой версией. Пока реплики не догнали изменение,
+    автор читает из основной базы.
+    """
+    transaction.on_commit(partial(bump_version, instance.author_id))
+    pin_primary(instance.author_id)
+
+
+@receiver(notes_bulk_created, sender=Note)
+def invalidate_pages_bulk(sender, notes, **kwargs):
+    for author_id in {note.author_id for note in notes}:
+        transaction.on_commit(partial(bump_version, author_id))
+        pin_primary(author_id)
+
+
+def shift_note_counts(deltas):
+    """Прибавляет к счётчикам заметок папок {id папки: разница}."""
+    for folder_id, delta in deltas.items():
+        if folder_id is not None and delta:
+            Folder.objects.filter(pk=folder_id).update(
+                note_count=F('note_count') + delta
+            )
+
+
+@receiver(post_save, sender=Note)
+def count_saved_note(sender, instance, created, update_fields=None,
+                     **kwargs):
+    """Переносит заметку в счётчик новой папки без COUNT(*)."""
+    # При отложенных полях Django сам подставляет update_fields с attname.
+    if update_fields is not None and not FOLDER_FIELDS & set(update_fields):
+        return
+    if created:
+        old_folder_id = None
+    elif hasattr(instance, 'loaded_folder_id'):
+        old_folder_id = instance.loaded_folder_id
+    else:
+        # Папка не загружалась из базы, значит, и не менялась.
+        return
+    instance.loaded_folder_id = instance.folder_id
+    if old_folder_id != instance.folder_id:
+        shift_note_counts({old_folder_id: -1, instance.folder_id: 1})
+
+
+@receiver(post_delete, sender=Note)
+@unless_muted
+def count_deleted_note(sender, instance, **kwargs):
+    shift_note_counts({instance.folder_id: -1})
+
+
+@receiver(notes_bulk_created, sender=Note)
+def count_notes_bulk(sender, notes, **kwargs):
+    deltas = {}
+    for note in notes:
+        deltas[note.folder_id] = deltas.get(note.folder_id, 0) + 1
+    shift_note_counts(deltas)
+
+
+@receiver(post_save, sender=Note)
+def count_saved_note_stats(sender, instance, created, update_fields=None,
+                           **kwargs):
+    """Обновляет сводку автора в транзакции сохранения заметки."""
+    text_bytes = 0
+    text_saved = update_fields is None or 'text' in update_fields
+    if text_saved and 'text' not in instance.get_deferred_fields():
+        new_bytes = len(instance.text.encode())
+        old_bytes = 0 if created else getattr(
+            instance, 'loaded_text_bytes', None
+        )
+        text_bytes = None if old_bytes is None else new_bytes - old_bytes
+        instance.loaded_text_bytes = new_bytes
+    shift_stats(
+        instance.author_id,
+        notes=int(created),
+        text_bytes=text_bytes,
+        modified=instance.updated,
+    )
+
+
+@receiver(pre_delete, sender=Note)
+@unless_muted
+def measure_deleted_note(sender, instance, **kwargs):
+    # После удаления размер текста уже не узнать.
+    if not hasattr(instance, 'loaded_text_bytes'):
+        instance.loaded_text_bytes = Note.objects.filter(
+            pk=instance.pk
+        ).values_list(OctetLength('text'), flat=True).first() or 0
+
+
+@receiver(post_delete, sender=Note)
+@unless_muted
+def count_deleted_note_stats(sender, instance, **kwargs):
+    # Сводку не пересоздаём: при удалении автора её строка уже удалена.
+    AuthorStats.objects.filter(author_id=instance.author_id).update(
+        note_count=F('note_count') - 1,
+        text_bytes=F('text_bytes') - instance.loaded_text_bytes,
+        last_modified=timezone.now(),
+    )
+
+
+@receiver(notes_bulk_created, sender=Note)
+def count_notes_bulk_stats(sender, notes, **kwargs):
+    for author_id in {note.author_id for note in notes}:
+        written = [note for note in notes if note.author_id == author_id]
+        shift_stats(
+            author_id,
+            notes=len(written),
+            text_bytes=sum(len(note.text.encode()) for note in written),
+            modified=max(note.updated for note in written),
+        )
+
+
+@receiver(user_logged_in)
+def cache_logged_in_user(sender, user, **kwargs):
+    """Первый запрос после входа не читает пользователя из базы."""
+    remember_user(user)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_changed_user(sender, instance, **kwargs):
+    """Смена пароля или блокировка видна со следующего запроса."""
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_in)
+@receiver(user_logged_out)
+def invalidate_pages_on_login(sender, user, **kwargs):
+    """После входа и выхода меняются сессия и CSRF-куки: рендерим заново."""
+    if user is not None:
+        bump_version(user.pk)
+
+
+@receiver(post_delete, sender=Note)
+@unless_muted
+def leave_tombstone(sender, instance, **kwargs):
+    """Запоминает удаление, чтобы отдать его при синхронизации."""
+    NoteTombstone.objects.create(
+        author_id=instance.author_id,
+        note_id=instance.pk,
+        slug=instance.slug,
+        change_seq=ChangeCounter.objects.reserve(instance.author_id),
+    )
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def drop_author_leftovers(sender, instance, **kwargs):
+    """Удаляет записи, созданные сигналами заметок при удалении автора.
+
+    Каскад удаляет надгробия и счётчик автора раньше его заметок, а
+    удаление каждой заметки оставляет новое надгробие.
+    """
+    NoteTombstone.objects.filter(author_id=instance.pk).delete()
+    ChangeCounter.objects.filter(author_id=instance.pk).delete()
+    AuthorStats.objects.filter(author_id=instance.pk).delete()
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    """Применяет PRAGMA профиля SQLITE_PROFILE к новому соединению."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = settings.SQLITE_PROFILES[settings.SQLITE_PROFILE]
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def count_queries(sender, connection, **kwargs):
+    """Подключает учёт запросов для PerformanceMiddleware."""
+    if metrics.record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.record_query)
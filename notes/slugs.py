@@ -0,0 +1,109 @@
+from collections import Counter
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.db.models import Q
+from pytils.translit import slugify
+
+TRANSLIT_CACHE_SIZE = 1024
+# Основа slug для заголовков без букв и цифр, например '!!!' или эмодзи.
+FALLBACK_BASE = 'note'
+# Суффикс «-9999» и короче: хватит на любое разумное число тёзок.
+MAX_SUFFIX_LENGTH = 5
+# Сколько диапазонов base-N объединять через OR в одном запросе.
+RANGES_PER_QUERY = 100
+
+
+@lru_cache(maxsize=TRANSLIT_CACHE_SIZE)
+def transliterate(title):
+    """Транслитерация с кешем: импорт и формы часто повторяют заголовки."""
+    return slugify(title)
+
+
+def slug_base(title, max_length):
+    return transliterate(title)[:max_length] or FALLBACK_BASE
+
+
+def with_suffix(base, number, max_length):
+    suffix = f'-{number}'
+    return base[:max_length - len(suffix)] + suffix
+
+
+def candidates_filter(base, max_length):
+    """Условие на slug вида base и base-N, которое идёт по индексу slug."""
+    if len(base) + MAX_SUFFIX_LENGTH <= max_length:
+        # Все base-N лежат между 'base-' и 'base.': '.' идёт сразу за '-'.
+        candidates = Q(slug__gt=base + '-', slug__lt=base + '.')
+    else:
+        # Длинный base при добавлении суффикса обрезается.
+        stem = base[:max_length - MAX_SUFFIX_LENGTH]
+        candidates = Q(slug__gte=stem, slug__lt=stem + '\uffff')
+    return Q(slug=base) | candidates
+
+
+def taken_slugs(queryset, base, max_length):
+    """Занятые slug вида base и base-N одним запросом."""
+    return set(
+        queryset.filter(candidates_filter(base, max_length))
+        .values_list('slug', flat=True)
+    )
+
+
+def next_free(base, taken, max_length):
+    if base not in taken:
+        return base
+    number = 2
+    while with_suffix(base, number, max_length) in taken:
+        number += 1
+    return with_suffix(base, number, max_length)
+
+
+def allocate_slug(model, title, exclude_pk=None):
+    """Свободный slug по заголовку: title, title-2, title-3, ..."""
+    max_length = model._meta.get_field('slug').max_length
+    base = slug_base(title, max_length)
+    queryset = model.objects.all()
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return next_free(
+        base, taken_slugs(queryset, base, max_length), max_length
+    )
+
+
+def allocate_slugs(model, rows):
+    """Slug для пачки пар (заголовок, slug) по правилам Note.save.
+
+    Пустой slug подбирается по заголовку с суффиксом, явный сохраняется;
+    для явного slug, который уже занят, возвращается None. Обычно хватает
+    одного запроса: base-N ищутся только для совпавших base.
+    """
+    max_length = model._meta.get_field('slug').max_length
+    bases = [slug or slug_base(title, max_length) for title, slug in rows]
+    taken = set(
+        model.objects.filter(slug__in=set(bases))
+        .values_list('slug', flat=True)
+    )
+    explicit = {slug for _, slug in rows if slug}
+    repeats = Counter(
+        base for base, (_, slug) in zip(bases, rows) if not slug
+    )
+    collided = sorted(
+        base for base, count in repeats.items()
+        if count > 1 or base in taken or base in explicit
+    )
+    for start in range(0, len(collided), RANGES_PER_QUERY):
+        chunk = collided[start:start + RANGES_PER_QUERY]
+        taken |= set(
+            model.objects.filter(reduce(or_, (
+                candidates_filter(base, max_length) for base in chunk
+            ))).values_list('slug', flat=True)
+        )
+    slugs = []
+    for base, (_, slug) in zip(bases, rows):
+        if slug and slug in taken:
+            slugs.append(None)
+            continue
+        slug = slug or next_free(base, taken, max_length)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
@@ -0,0 +1,61 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+
+from .functions import OctetLength
+from .models import AuthorStats, Note
+
+
+def get_stats(author):
+    """Сводка автора; без строки в таблице у автора нет заметок."""
+    return AuthorStats.objects.filter(author=author).first() or AuthorStats(
+        author=author
+    )
+
+
+def aggregate_stats(author_ids):
+    """Сводки авторов, посчитанные заново по таблице заметок."""
+    rows = Note.objects.filter(author_id__in=author_ids).values(
+        'author_id'
+    ).annotate(
+        note_count=Count('id'),
+        text_bytes=Sum(OctetLength('text')),
+        last_modified=Max('updated'),
+    ).order_by()
+    stats = {author_id: AuthorStats(author_id=author_id)
+             for author_id in author_ids}
+    for row in rows:
+        stats[row['author_id']] = AuthorStats(**row)
+    return list(stats.values())
+
+
+def recompute_stats(author_ids):
+    """Перезаписывает сводки авторов по таблице заметок."""
+    with transaction.atomic():
+        stats = aggregate_stats(author_ids)
+        AuthorStats.objects.filter(author_id__in=author_ids).delete()
+        AuthorStats.objects.bulk_create(stats)
+    return stats
+
+
+def shift_stats(author_id, notes=0, text_bytes=None, modified=None):
+    """Прибавляет изменения к сводке автора в текущей транзакции.
+
+    text_bytes=None значит, что разница в байтах неизвестна: тогда
+    сводка пересчитывается целиком, как и при её первом создании.
+    """
+    if text_bytes is not None and AuthorStats.objects.filter(
+        author_id=author_id
+    ).update(
+        note_count=F('note_count') + notes,
+        text_bytes=F('text_bytes') + text_bytes,
+        last_modified=modified or timezone.now(),
+    ):
+        return
+    try:
+        with transaction.atomic():
+            recompute_stats([author_id])
+    except IntegrityError:
+        # Сводку успела создать параллельная транзакция: после её коммита
+        # пересчёт увидит и её заметки, и наши.
+        recompute_stats([author_id])
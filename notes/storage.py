@@ -0,0 +1,73 @@
+"""Статика с хешем в имени и заранее сжатыми копиями."""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.txt', '.json', '.map', '.html')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def gzip_bytes(content):
+    # mtime=0: одинаковый файл даёт одинаковый архив при каждом collectstatic.
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(content):
+    return brotli.compress(content, quality=11)
+
+
+COMPRESSORS = {'br': brotli_bytes, 'gzip': gzip_bytes}
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых через q=0."""
+    codings = set()
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        quality = params.strip().partition('=')[2]
+        try:
+            if quality and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        if coding:
+            codings.add(coding)
+    return codings
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """Рядом с каждым файлом с хешем кладёт его копии .gz и .br.
+
+    Сжатая копия пишется, только если она меньше исходника; .br — только
+    если установлен пакет brotli.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        compressors = [
+            (suffix, COMPRESSORS[coding])
+            for coding, suffix in ENCODINGS
+            if coding != 'br' or brotli is not None
+        ]
+        for name in sorted(set(self.hashed_files.values())):
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            with self.open(name) as original:
+                content = original.read()
+            for suffix, compress in compressors:
+                compressed = compress(content)
+                if len(compressed) >= len(content):
+                    continue
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
+                yield name, name + suffix, True
@@ -0,0 +1,26 @@
+from .models import Note, NoteTombstone
+
+
+def changes_since(author, since, limit):
+    """Изменения заметок автора с номером больше since, по возрастанию.
+
+    Возвращает изменённые заметки, удалённые заметки, номер последнего
+    отданного изменения и признак, что изменения ещё остались.
+    """
+    notes = list(
+        Note.objects.filter(author=author, change_seq__gt=since)
+        .order_by('change_seq')[:limit + 1]
+    )
+    tombstones = list(
+        NoteTombstone.objects.filter(author=author, change_seq__gt=since)
+        .order_by('change_seq')[:limit + 1]
+    )
+    merged = sorted(notes + tombstones, key=lambda item: item.change_seq)
+    batch = merged[:limit]
+    last_seq = batch[-1].change_seq if batch else since
+    return (
+        [item for item in batch if isinstance(item, Note)],
+        [item for item in batch if isinstance(item, NoteTombstone)],
+        last_seq,
+        len(merged) > limit,
+    )
@@ -47,7 +47,7 @@ class TestHomePage(TestCase):
         self.client.force_login(self.author)
         response = self.client.get(self.HOME_URL)
         object_list = response.context['object_list']
-        notes_count = object_list.count()
+        notes_count = len(object_list)
         self.assertEqual(notes_count, self.NOTES_COUNT + 1)
 
     def test_only_authors_notes_and_have_context(self):
@@ -1,6 +1,8 @@
 from django.urls import path
 
-from notes import views
+from notes import api, views
+from notes.async_views import read_view, stream_view
+from notes.routers import replica_view
 
 app_name = 'notes'
 
@@ -8,8 +10,77 @@ urlpatterns = [
     path('', views.Home.as_view(), name='home'),
     path('add/', views.NoteCreate.as_view(), name='add'),
     path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
-    path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
+    path(
+        'note/<slug:slug>/',
+        read_view(replica_view(views.NoteDetail.as_view())),
+        name='detail',
+    ),
+    path(
+        'note/<slug:slug>/body/',
+        replica_view(stream_view(views.NoteBody.as_view())),
+        name='body',
+    ),
+    path(
+        'note/<slug:slug>/history/',
+        views.NoteHistory.as_view(),
+        name='history',
+    ),
+    path(
+        'note/<slug:slug>/history/<int:number>/',
+        views.NoteRevisionDiff.as_view(),
+        name='revision',
+    ),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
-    path('notes/', views.NotesList.as_view(), name='list'),
+    path(
+        'notes/',
+        read_view(replica_view(views.NotesList.as_view())),
+        name='list',
+    ),
+    path('notes/bulk/', views.NoteBulk.as_view(), name='bulk'),
+    path('folders/', views.FolderList.as_view(), name='folders'),
+    path(
+        'folders/<int:pk>/edit/',
+        views.FolderUpdate.as_view(),
+        name='folder_edit',
+    ),
+    path(
+        'folders/<int:pk>/delete/',
+        views.FolderDelete.as_view(),
+        name='folder_delete',
+    ),
+    path('tags/', views.TagList.as_view(), name='tags'),
+    path('tags/<int:pk>/edit/', views.TagUpdate.as_view(), name='tag_edit'),
+    path(
+        'tags/<int:pk>/delete/',
+        views.TagDelete.as_view(),
+        name='tag_delete',
+    ),
+    path('search/', replica_view(views.NoteSearch.as_view()), name='search'),
+    path(
+        'export/',
+        replica_view(stream_view(views.NoteExport.as_view())),
+        name='export',
+    ),
+    path(
+        'api/notes/',
+        read_view(replica_view(api.ApiNoteList.as_view())),
+        name='api_list',
+    ),
+    path(
+        'api/notes/<slug:slug>/',
+        read_view(replica_view(api.ApiNoteDetail.as_view())),
+        name='api_detail',
+    ),
+    path(
+        'api/stats/',
+        read_view(replica_view(api.ApiStats.as_view())),
+        name='api_stats',
+    ),
+    path(
+        'sync/',
+        read_view(replica_view(api.ApiSync.as_view())),
+        name='sync',
+    ),
+    path('metrics/', views.Metrics.as_view(), name='metrics'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
 ]
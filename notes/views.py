@@ -1,15 +1,53 @@
+import difflib
+import mimetypes
+import os
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
+from django.db.models import Prefetch
+from django.db.models.functions import Length, Substr
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import patch_vary_headers
+from django.utils.html import format_html
+from django.utils.http import http_date, urlencode
 from django.views import generic
+from django.views.static import was_modified_since
+
+from . import metrics
+from .bulk import bulk_delete, bulk_move, bulk_tag
+from .cache import CachedPageMixin
+from .export import FORMATS, export_notes
+from .forms import FolderForm, NoteBulkForm, NoteForm, TagForm
+from .models import Folder, Note, Tag
+from .pagination import get_cursor, keyset_page
+from .revisions import load_chain, replay, revision_text
+from .search import search_notes
+from .stats import get_stats
+from .storage import ENCODINGS, accepted_encodings
+
+# Год: дольше браузеры всё равно не хранят.
+IMMUTABLE = 'public, max-age=31536000, immutable'
 
-from .forms import NoteForm
-from .models import Note
+LIST_FILTERS = ('folder', 'tag')
 
 
 class Home(generic.TemplateView):
-    """Домашняя страница."""
+    """Домашняя страница со сводкой по заметкам пользователя."""
     template_name = 'notes/home.html'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.request.user.is_authenticated:
+            context['stats'] = get_stats(self.request.user)
+        return context
+
 
 class NoteSuccess(LoginRequiredMixin, generic.TemplateView):
     """Страница успешного выполнения операции."""
@@ -25,6 +63,10 @@ class NoteBase(LoginRequiredMixin):
         """Пользователь может работать только со своими заметками."""
         return self.model.objects.filter(author=self.request.user)
 
+    def get_form_kwargs(self):
+        """Форма предлагает папки и метки текущего пользователя."""
+        return {**super().get_form_kwargs(), 'author': self.request.user}
+
 
 class NoteCreate(NoteBase, generic.CreateView):
     """Добавление заметки."""
@@ -32,9 +74,8 @@ class NoteCreate(NoteBase, generic.CreateView):
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        # Заметку и её метки сохраняет form.save() в super(): один раз.
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
@@ -43,17 +84,361 @@ class NoteUpdate(NoteBase, generic.UpdateView):
     template_name = 'notes/form.html'
     form_class = NoteForm
 
+    def get_queryset(self):
+        return super().get_queryset().for_edit()
+
 
 class NoteDelete(NoteBase, generic.DeleteView):
     """Удаление заметки."""
     template_name = 'notes/delete.html'
 
+    def get_queryset(self):
+        return super().get_queryset().for_delete()
+
 
-class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+class NotesList(CachedPageMixin, NoteBase, generic.ListView):
+    """Список заметок пользователя с постраничной выдачей по курсору."""
     template_name = 'notes/list.html'
+    cache_name = 'list'
+
+    def get_queryset(self):
+        # Фильтры по папке и метке идут через уникальные индексы
+        # (author, name), метки страницы приходят одним запросом.
+        self.filters = {
+            name: self.request.GET[name]
+            for name in LIST_FILTERS if self.request.GET.get(name)
+        }
+        queryset = super().get_queryset().for_list().prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.only('id', 'name'))
+        )
+        user = self.request.user
+        if 'folder' in self.filters:
+            queryset = queryset.filter(
+                folder__author=user, folder__name=self.filters['folder']
+            )
+        if 'tag' in self.filters:
+            queryset = queryset.filter(
+                tags__author=user, tags__name=self.filters['tag']
+            )
+        return queryset
 
+    def get_context_data(self, **kwargs):
+        page, next_cursor = keyset_page(
+            self.object_list,
+            get_cursor(self.request),
+            settings.NOTES_PAGE_SIZE,
+        )
+        context = super().get_context_data(object_list=page, **kwargs)
+        context['next_cursor'] = next_cursor
+        context['filters'] = self.filters
+        context['filter_query'] = urlencode(self.filters)
+        context['folders'] = Folder.objects.filter(
+            author=self.request.user
+        ).only('id', 'name', 'note_count')
+        context['bulk_form'] = NoteBulkForm(author=self.request.user)
+        return context
 
-class NoteDetail(NoteBase, generic.DetailView):
-    """Заметка подробно."""
+
+class NoteDetail(CachedPageMixin, NoteBase, generic.DetailView):
+    """Заметка подробно.
+
+    HTML длинной заметки в страницу не попадает: вместо него начало
+    текста и ссылка на NoteBody.
+    """
     template_name = 'notes/detail.html'
+    cache_name = 'detail'
+
+    def get_queryset(self):
+        return super().get_queryset().for_detail()
+
+
+def iter_body(note, chunk_size):
+    """HTML заметки кусками по chunk_size символов, по запросу на кусок."""
+    yield format_html(
+        '<!DOCTYPE html>\n<html lang="ru">\n<head>\n<meta charset="utf-8">\n'
+        '<title>{}</title>\n</head>\n<body>\n<article>\n',
+        note.title,
+    )
+    chunks = Note.objects.using(note._state.db).filter(pk=note.pk)
+    for start in range(1, note.body_size + 1, chunk_size):
+        yield chunks.values_list(
+            Substr('text_html', start, chunk_size), flat=True
+        ).get()
+    yield '\n</article>\n</body>\n</html>\n'
+
+
+class NoteBody(NoteBase, generic.View):
+    """Текст заметки целиком, отдаётся потоком."""
+
+    def get(self, request, slug):
+        note = get_object_or_404(
+            self.get_queryset().only('id', 'title').annotate(
+                body_size=Length('text_html')
+            ),
+            slug=slug,
+        )
+        return StreamingHttpResponse(
+            iter_body(note, settings.NOTES_TEXT_CHUNK_SIZE),
+            content_type='text/html; charset=utf-8',
+        )
+
+
+class NoteHistory(NoteBase, generic.ListView):
+    """Версии текста заметки, новые сверху."""
+    template_name = 'notes/history.html'
+    context_object_name = 'revisions'
+
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_PAGE_SIZE
+
+    def get_queryset(self):
+        self.note = get_object_or_404(
+            super().get_queryset().for_list(), slug=self.kwargs['slug']
+        )
+        return self.note.revisions.defer('data').order_by('-number')
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(note=self.note, **kwargs)
+
+
+class NoteRevisionDiff(NoteBase, generic.TemplateView):
+    """Изменения версии по сравнению с предыдущей."""
+    template_name = 'notes/revision.html'
+
+    def get_context_data(self, **kwargs):
+        note = get_object_or_404(
+            super().get_queryset().for_list(), slug=kwargs['slug']
+        )
+        number = kwargs['number']
+        texts = {
+            revision.number: text
+            for revision, text in replay(load_chain(note.pk, number))
+        }
+        if number not in texts:
+            raise Http404('Такой версии нет.')
+        previous = texts.get(number - 1)
+        if previous is None and number > 1:
+            previous = revision_text(note.pk, number - 1)
+        diff = difflib.unified_diff(
+            (previous or '').splitlines(),
+            texts[number].splitlines(),
+            f'Версия {number - 1}',
+            f'Версия {number}',
+            lineterm='',
+        )
+        return super().get_context_data(
+            note=note,
+            has_previous=previous is not None,
+            diff='\n'.join(diff),
+            **kwargs,
+        )
+
+
+class NoteBulk(NoteBase, generic.FormView):
+    """Удаление, перенос в папку или метка сразу для многих заметок."""
+    template_name = 'notes/bulk.html'
+    form_class = NoteBulkForm
+    http_method_names = ('post',)
+
+    def form_valid(self, form):
+        data = form.cleaned_data
+        chunk_size = settings.NOTES_BULK_CHUNK_SIZE
+        user = self.request.user
+        if data['action'] == NoteBulkForm.DELETE:
+            bulk_delete(user, data['notes'], chunk_size)
+        elif data['action'] == NoteBulkForm.MOVE:
+            bulk_move(user, data['notes'], data['folder'], chunk_size)
+        else:
+            bulk_tag(user, data['notes'], data['tag'], chunk_size)
+        return super().form_valid(form)
+
+
+class LabelBase(LoginRequiredMixin):
+    """Папки или метки пользователя: видны и меняются только свои."""
+    model = None
+    form_class = None
+    title = None
+    list_url = None
+    edit_url = None
+    delete_url = None
+
+    def get_queryset(self):
+        return self.model.objects.filter(author=self.request.user)
+
+    def get_form_kwargs(self):
+        return {**super().get_form_kwargs(), 'author': self.request.user}
+
+    def get_success_url(self):
+        return reverse(self.list_url)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['title'] = self.title
+        context['list_url'] = self.list_url
+        context['edit_url'] = self.edit_url
+        context['delete_url'] = self.delete_url
+        return context
+
+
+class FolderMixin:
+    model = Folder
+    form_class = FolderForm
+    title = 'Папки'
+    list_url = 'notes:folders'
+    edit_url = 'notes:folder_edit'
+    delete_url = 'notes:folder_delete'
+
+
+class TagMixin:
+    model = Tag
+    form_class = TagForm
+    title = 'Метки'
+    list_url = 'notes:tags'
+    edit_url = 'notes:tag_edit'
+    delete_url = 'notes:tag_delete'
+
+
+class LabelList(LabelBase, generic.CreateView):
+    """Свои папки или метки и форма для новой."""
+    template_name = 'notes/labels.html'
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
+        return super().form_valid(form)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['labels'] = self.get_queryset()
+        return context
+
+
+class LabelUpdate(LabelBase, generic.UpdateView):
+    """Переименование папки или метки."""
+    template_name = 'notes/label_form.html'
+
+
+class LabelDelete(LabelBase, generic.DeleteView):
+    """Удаление папки или метки; заметки остаются."""
+    template_name = 'notes/label_delete.html'
+
+
+class FolderList(FolderMixin, LabelList):
+    pass
+
+
+class FolderUpdate(FolderMixin, LabelUpdate):
+    pass
+
+
+class FolderDelete(FolderMixin, LabelDelete):
+    pass
+
+
+class TagList(TagMixin, LabelList):
+    pass
+
+
+class TagUpdate(TagMixin, LabelUpdate):
+    pass
+
+
+class TagDelete(TagMixin, LabelDelete):
+    pass
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_notes(
+            self.request.user, self.query, settings.NOTES_SEARCH_LIMIT
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+class NoteExport(LoginRequiredMixin, generic.View):
+    """Потоковая выгрузка всех заметок пользователя."""
+
+    def get(self, request):
+        export_format = request.GET.get('format', 'jsonl')
+        if export_format not in FORMATS:
+            raise Http404('Неизвестный формат выгрузки.')
+        _, content_type, extension = FORMATS[export_format]
+        response = StreamingHttpResponse(
+            export_notes(request.user, export_format),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{extension}"'
+        )
+        return response
+
+
+class Metrics(generic.View):
+    """Счётчики приложения для Prometheus.
+
+    Открыты персоналу и адресам из NOTES_METRICS_ALLOWED_IPS (за
+    прокси REMOTE_ADDR - адрес прокси).
+    """
+
+    def get(self, request):
+        if not (
+            request.user.is_staff
+            or request.META.get('REMOTE_ADDR')
+            in settings.NOTES_METRICS_ALLOWED_IPS
+        ):
+            raise PermissionDenied('Метрики закрыты.')
+        return HttpResponse(
+            metrics.render(), content_type='text/plain; version=0.0.4'
+        )
+
+
+class StaticFile(generic.View):
+    """Файлы из STATIC_ROOT, сжатые копии отдаются, если клиент их примет.
+
+    Имена с хешем содержимого не меняют содержимое, поэтому браузер
+    кеширует их навсегда и не перепроверяет.
+    """
+
+    def get(self, request, path):
+        try:
+            full_path = staticfiles_storage.path(path)
+        except SuspiciousFileOperation:
+            raise Http404('Файл не найден.')
+        if not os.path.isfile(full_path):
+            raise Http404('Файл не найден.')
+        stat = os.stat(full_path)
+        if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime,
+            stat.st_size,
+        ):
+            return HttpResponseNotModified()
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        served_path, encoding = full_path, None
+        for coding, suffix in ENCODINGS:
+            if coding in accepted and os.path.isfile(full_path + suffix):
+                served_path, encoding = full_path + suffix, coding
+                break
+        response = FileResponse(
+            open(served_path, 'rb'), filename=os.path.basename(full_path)
+        )
+        content_type, _ = mimetypes.guess_type(full_path)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        hashed_names = getattr(staticfiles_storage, 'hashed_files', {})
+        response['Cache-Control'] = (
+            IMMUTABLE if path in hashed_names.values() else 'no-cache'
+        )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
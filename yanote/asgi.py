@@ -11,6 +11,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from notes.checks import require_static_manifest
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+os.environ.setdefault('NOTES_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+require_static_manifest()
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -22,10 +23,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.middleware.PerformanceMiddleware',
+    'notes.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
+    'notes.middleware.SessionBackendMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -56,9 +60,77 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплики для чтения: NOTES_REPLICA_DBS - пути к файлам SQLite через
+# запятую. Локально файл реплики обновляет sync_sqlite_replicas.
+NOTES_DB_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.getenv('NOTES_REPLICA_DBS', '').split(',')), start=1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path.strip(),
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    }
+    NOTES_DB_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['notes.routers.ReplicaRouter']
+NOTES_REPLICA_STICKY_SECONDS = 10
+NOTES_REPLICA_CACHE_ALIAS = 'state'
+
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -64 * 1024,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'production')
+
+
+# Версии страниц и всё, что сбрасывается при записи, должны видеть все
+# процессы: кеш в файлах общий для воркеров одной машины. Для нескольких
+# машин нужен Memcached или Redis.
+# default - страницы, сессии и пользователи: их можно потерять, при
+# переполнении удаляется десятая часть записей. state - версии страниц и
+# закрепления за основной базой: маленькие, не удаляются никогда.
+CACHE_DIR = Path(os.getenv('NOTES_CACHE_DIR', BASE_DIR / '.cache'))
+CACHES = {
+    'default': {
+        'BACKEND': 'notes.cache_backends.FileCache',
+        'LOCATION': CACHE_DIR / 'default',
+        'OPTIONS': {
+            'MAX_ENTRIES': 200_000,
+            'CULL_FREQUENCY': 10,
+            'CULL_EVERY': 100,
+        },
+    },
+    'state': {
+        'BACKEND': 'notes.cache_backends.FileCache',
+        'LOCATION': CACHE_DIR / 'state',
+        'OPTIONS': {'CULL_EVERY': None},
+    },
+}
+# True разрешает кеш в памяти процесса (LocMemCache), если приложение
+# работает в одном процессе.
+NOTES_SINGLE_WORKER = False
+
+# Сессия читается из кеша; NOTES_SESSION_ENGINE переключает на
+# django.contrib.sessions.backends.cache или signed_cookies.
+SESSION_ENGINE = os.getenv(
+    'NOTES_SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db'
+)
+
+
+AUTHENTICATION_BACKENDS = ['notes.auth.CachedModelBackend']
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -82,8 +154,60 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
+# При DEBUG = False страницы ссылаются на файлы из манифеста, поэтому
+# перед запуском сервера обязателен python manage.py collectstatic:
+# без него yanote.wsgi и yanote.asgi не стартуют (проверка notes.E002).
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+STATICFILES_STORAGE = 'notes.storage.CompressedManifestStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_PAGE_SIZE = 100
+NOTES_EXACT_COUNT_LIMIT = 10000
+NOTES_ADMIN_SEARCH_LIMIT = 1000
+
+NOTES_TEXT_INLINE_LIMIT = 256 * 1024
+NOTES_TEXT_PREVIEW_SIZE = 4000
+NOTES_TEXT_CHUNK_SIZE = 64 * 1024
+
+NOTES_SEARCH_LIMIT = 50
+NOTES_SEARCH_CHUNK_SIZE = 2000
+
+NOTES_CACHE_ALIAS = 'default'
+NOTES_VERSION_CACHE_ALIAS = 'state'
+NOTES_CACHE_TIMEOUT = 60 * 60
+
+NOTES_COMPRESS_MIN_SIZE = 1024
+
+NOTES_USER_CACHE_ALIAS = 'default'
+NOTES_USER_CACHE_TIMEOUT = 5 * 60
+
+NOTES_EXPORT_CHUNK_SIZE = 2000
+NOTES_IMPORT_BATCH_SIZE = 500
+
+NOTES_SYNC_BATCH_SIZE = 500
+
+NOTES_STATS_BATCH_SIZE = 500
+NOTES_BULK_CHUNK_SIZE = 500
+
+NOTES_REVISION_SNAPSHOT_INTERVAL = 20
+NOTES_REVISION_KEEP = 100
+NOTES_REVISION_BATCH_SIZE = 500
+
+NOTES_ASYNC_VIEWS = os.getenv('NOTES_ASYNC_VIEWS') == '1'
+NOTES_ASYNC_THREADS = 16
+# Потоковые ответы под ASGI идут через временный файл; столько байт
+# держится в памяти, дальше - на диске.
+NOTES_STREAM_SPOOL_SIZE = 1024 * 1024
+
+NOTES_METRICS_SAMPLE_RATE = 0.1
+# Адреса, с которых /metrics/ доступен без входа, через запятую.
+NOTES_METRICS_ALLOWED_IPS = [
+    address.strip()
+    for address in os.getenv('NOTES_METRICS_ALLOWED_IPS', '').split(',')
+    if address.strip()
+]
@@ -0,0 +1,29 @@
+"""Настройки для прогона тестов: быстрый хешер паролей и база в памяти.
+
+Статика без манифеста: тесты не запускают collectstatic. Кеш в памяти:
+каждый процесс тестов работает со своей базой.
+"""
+from yanote.settings import *  # noqa: F401,F403
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+NOTES_DB_REPLICAS = []
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'state': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'state',
+    },
+}
+NOTES_SINGLE_WORKER = True
+
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
@@ -1,12 +1,20 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
 
+from notes.views import StaticFile
+
 urlpatterns = [
     path('', include('notes.urls')),
     path('admin/', admin.site.urls),
+    path(
+        f'{settings.STATIC_URL.lstrip("/")}<path:path>',
+        StaticFile.as_view(),
+        name='static',
+    ),
 ]
 
 auth_urls = ([